@@ -44,13 +44,19 @@ image = (
         "mediapipe>=0.10.0",
         # Image/video processing
         "opencv-python-headless>=4.8.0",
+        # In-process frame decoding (FFmpeg libraries, incl. AV1); 14.1 adds
+        # VideoFrame.rotation, used to autorotate portrait footage
+        "av>=14.1.0",
         "Pillow>=10.0.0",
         "numpy>=1.24.0",
-        # HTTP requests (for RapidAPI and Convex storage uploads)
-        "httpx>=0.25.0",
+        # HTTP requests (for RapidAPI and Convex storage uploads; h2 for
+        # HTTP/2 to the AI APIs)
+        "httpx[http2]>=0.25.0",
         "requests>=2.31.0",
         # Data validation
         "pydantic>=2.0.0",
+        # Fast JSON serialization for LLM prompts/payloads
+        "orjson>=3.9.0",
         # Web endpoints
         "fastapi>=0.104.0",
         # Utilities
@@ -20,6 +20,8 @@ from enum import Enum
 from typing import Dict, Any, List, Optional, Tuple
 import asyncio
 
+from services.editing_intelligence import to_jsonable
+
 
 class AudienceType(Enum):
     """Target audience demographics."""
@@ -1390,7 +1392,7 @@ class AISelectionEnhancer:
         print(f"[{self.job_id}] Arc validation score: {arc_validation['score']:.2f}")
 
         # Step 8: Optimize pacing
-        beat_times = beat_analysis.get("beat_times", []) if beat_analysis else []
+        beat_times = to_jsonable(beat_analysis.get("beat_times", [])) if beat_analysis else []
         paced_clips = self.pacing_optimizer.optimize_pacing(
             optimized_clips,
             beat_times=beat_times,
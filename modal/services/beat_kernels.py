@@ -0,0 +1,160 @@
+"""
+Numba kernels for music beat analysis.
+
+These let BeatSyncEditor.analyze_music_beats compute its features from a
+single shared STFT (onset envelope for both peak picking and beat
+tracking) and a single pass over the signal (RMS energy curve), instead
+of once per librosa feature call, and pick onset peaks without librosa's
+mask-then-flatnonzero round trip. numba is a librosa dependency, so it
+is available wherever beat analysis runs.
+
+Kernels are deliberately serial: they are called from worker threads,
+and numba's parallel threading layers are not safe to launch from
+multiple Python threads.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def rms_from_signal(
+    y: np.ndarray, frame_length: int, hop_length: int, center: bool = True
+) -> np.ndarray:
+    """Per-frame RMS energy straight from the signal.
+
+    Matches librosa.feature.rms(y=y, center=center) (zero padding when
+    centered) but uses a running sum of squares, so each frame costs O(1)
+    and no (frame_length, n_frames) temporary is materialized.
+
+    Args:
+        y: Mono audio signal
+        frame_length: Samples per analysis frame
+        hop_length: Samples between successive frames
+        center: Whether frames are centered (signal padded by frame_length // 2)
+
+    Returns:
+        float32 array of RMS values, one per frame
+    """
+    n = y.shape[0]
+    half = frame_length // 2 if center else 0
+    n_frames = 1 + (n + 2 * half - frame_length) // hop_length
+
+    csum = np.zeros(n + 1, dtype=np.float64)
+    for i in range(n):
+        csum[i + 1] = csum[i] + y[i] * y[i]
+
+    out = np.empty(n_frames, dtype=np.float32)
+    for t in range(n_frames):
+        start = min(max(t * hop_length - half, 0), n)
+        stop = min(max(t * hop_length - half + frame_length, 0), n)
+        out[t] = np.sqrt(max(csum[stop] - csum[start], 0.0) / frame_length)
+
+    return out
+
+
+@njit(cache=True)
+def onset_from_logmel(log_mel: np.ndarray, pad_width: int):
+    """Onset strength (spectral flux) from a log-power mel spectrogram.
+
+    Matches librosa.onset.onset_strength(S=log_mel) with its defaults
+    (lag=1, max_size=1, centered frames): positive frame-to-frame
+    differences aggregated across bands, shifted right by pad_width frames
+    and trimmed to the input length. Both aggregations librosa uses are
+    produced from the same pass: mean (onset_strength's default, used for
+    peak picking) and median (what beat_track computes internally).
+
+    Args:
+        log_mel: Log-power mel spectrogram, shape (n_mels, n_frames)
+        pad_width: Leading frames of zero padding (1 + n_fft // (2 * hop))
+
+    Returns:
+        Tuple of float32 (mean_envelope, median_envelope), one value per frame
+    """
+    n_bands, n_frames = log_mel.shape
+    mean_env = np.zeros(n_frames, dtype=np.float32)
+    median_env = np.zeros(n_frames, dtype=np.float32)
+
+    for t in range(pad_width, n_frames):
+        j = t - pad_width
+        if j + 1 >= n_frames:
+            continue
+        flux = np.empty(n_bands, dtype=np.float64)
+        for f in range(n_bands):
+            d = log_mel[f, j + 1] - log_mel[f, j]
+            flux[f] = d if d > 0.0 else 0.0
+        mean_env[t] = flux.mean()
+        median_env[t] = np.median(flux)
+
+    return mean_env, median_env
+
+
+@njit(cache=True)
+def _window_mean(x: np.ndarray, lo: int, hi: int) -> np.float32:
+    """Mean of x[lo:hi], accumulated exactly as numba's np.mean does for float32."""
+    acc = np.float32(0.0)
+    for i in range(lo, hi):
+        acc += x[i]
+    return np.float32(acc / (hi - lo))
+
+
+@njit(cache=True)
+def peak_pick_fast(
+    x: np.ndarray,
+    pre_max: int,
+    post_max: int,
+    pre_avg: int,
+    post_avg: int,
+    delta: float,
+    wait: int,
+) -> np.ndarray:
+    """Peak indices of a float32 onset envelope in a single forward pass.
+
+    Same decisions as librosa.util.peak_pick(x, ...) (sparse output): a
+    frame is a peak if it equals the max of x[n - pre_max:n + post_max], is
+    at least delta above the mean of x[n - pre_avg:n + post_avg], and is
+    more than wait frames after the previous peak. The max scan stops at
+    the first larger neighbour, the mean is only evaluated for local
+    maxima, and indices are written directly instead of through a boolean
+    mask. (scipy.signal.find_peaks is not a substitute: its distance and
+    prominence criteria select different peaks than this mean-threshold
+    plus wait rule.)
+
+    Args:
+        x: Onset envelope (1-D float32)
+        pre_max, post_max: Frames before/after n for the local max window
+            (post_max >= 1)
+        pre_avg, post_avg: Frames before/after n for the local mean window
+        delta: Threshold offset above the local mean
+        wait: Frames to skip after a peak
+
+    Returns:
+        int64 array of peak frame indices
+    """
+    n_frames = x.shape[0]
+    out = np.empty(n_frames, dtype=np.int64)
+    count = 0
+    n = 0
+
+    while n < n_frames:
+        # Local max over the window (with post_max >= 1, n is inside it)
+        lo = max(0, n - pre_max)
+        hi = min(n + post_max, n_frames)
+        is_max = hi > lo
+        for i in range(lo, hi):
+            if x[i] > x[n]:
+                is_max = False
+                break
+
+        if is_max:
+            # The first frame's mean window only looks forward
+            lo = max(0, n - pre_avg) if n > 0 else 0
+            hi = min(n + post_avg, n_frames)
+            if hi > lo and x[n] >= _window_mean(x, lo, hi) + delta:
+                out[count] = n
+                count += 1
+                n += wait + 1
+                continue
+        n += 1
+
+    return out[:count]
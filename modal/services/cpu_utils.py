@@ -0,0 +1,55 @@
+"""
+Utility functions for sizing CPU-bound work to the container.
+
+Modal functions run under a cgroup CPU quota (cpu= in app.py), while
+os.cpu_count() reports every core on the host. Pools and concurrency
+limits should be sized from container_cpus() instead.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+
+def container_cpus() -> int:
+    """
+    CPUs this container may actually use.
+
+    os.cpu_count() reports the host's cores; the function's cpu= limit is
+    a cgroup quota, so read that when present.
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return max(1, int(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+
+# Process pool for CPU-bound pure-Python work, shared by every service
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Lazily create the shared process pool, one worker per container CPU.
+
+    Workers are started from a forkserver rather than forked, since callers
+    have thread pools (and their locks) live. The pool is shut down at exit.
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=container_cpus(),
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+                atexit.register(_process_pool.shutdown, wait=False, cancel_futures=True)
+    return _process_pool
@@ -7,34 +7,65 @@ AI-powered scene analysis and music-synchronized editing for trailers:
 3. Beat-Sync Editing - Librosa-based cut alignment to music
 """
 
+import asyncio
+import functools
+import hashlib
 import json
+import mmap
 import os
-from dataclasses import dataclass, asdict
-from typing import Optional, List, Dict, Any
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field
+from typing import Optional, List, Dict, Any, ClassVar, Tuple
 
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Comes in with librosa (via scikit-learn)
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+from .cpu_utils import container_cpus, get_process_pool
+
+
+def _dumps_indented(obj: Any) -> str:
+    """Pretty-print JSON for prompts, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
 
 # ============================================
 # SCENE IMPORTANCE SCORING
 # ============================================
 
 
-@dataclass
+@dataclass(slots=True)
 class SceneImportanceScore:
     """Multi-dimensional scene importance scoring (0-1 scales)."""
 
+    # (emotional, visual, narrative) weights for combined_score
+    _WEIGHTS: ClassVar[Tuple[float, float, float]] = (0.35, 0.30, 0.35)
+
     emotional_score: float  # Emotional intensity (faces, expressions, dialogue tone)
     visual_score: float  # Visual interest (motion, composition, color contrast)
     narrative_score: float  # Story value (dialogue content, character moments)
-
-    @property
-    def combined_score(self) -> float:
-        """Weighted combination of all scores."""
-        return (
-            self.emotional_score * 0.35
-            + self.visual_score * 0.30
-            + self.narrative_score * 0.35
+    combined_score: float = field(init=False)  # Weighted combination of all scores
+
+    def __post_init__(self):
+        w_emotional, w_visual, w_narrative = self._WEIGHTS
+        self.combined_score = (
+            self.emotional_score * w_emotional
+            + self.visual_score * w_visual
+            + self.narrative_score * w_narrative
         )
 
     @property
@@ -139,6 +170,15 @@ class SceneImportanceScorer:
         scene: Dict[str, Any],
         transcript_segment: Optional[Dict[str, Any]] = None,
         audio_features: Optional[Dict[str, Any]] = None,
+    ) -> SceneImportanceScore:
+        """Async wrapper around score_scene_sync (scoring never awaits)."""
+        return self.score_scene_sync(scene, transcript_segment, audio_features)
+
+    def score_scene_sync(
+        self,
+        scene: Dict[str, Any],
+        transcript_segment: Optional[Dict[str, Any]] = None,
+        audio_features: Optional[Dict[str, Any]] = None,
     ) -> SceneImportanceScore:
         """Score a single scene across all dimensions.
 
@@ -200,7 +240,7 @@ class SceneImportanceScorer:
                     break
 
             # Score the scene
-            score = await self.score_scene(
+            score = self.score_scene_sync(
                 scene=scene,
                 transcript_segment=transcript_seg,
             )
@@ -293,6 +333,10 @@ class SceneImportanceScorer:
         elif len(colors) == 1:
             score += 0.05  # Monochromatic can be stylistic
 
+        # Only bonuses remain below, so a saturated score is final
+        if score >= 1.0:
+            return 1.0
+
         # Keyframe density (more keyframes = more visual changes)
         keyframes = scene.get("keyframeTimestamps") or []
         if duration > 0 and len(keyframes) > 0:
@@ -363,7 +407,6 @@ class SceneImportanceScorer:
 # DIALOGUE SELECTION AI
 # ============================================
 
-
 class DialogueSelectionAI:
     """Select the best dialogue lines for trailer using GPT-4o.
 
@@ -427,6 +470,15 @@ Avoid:
         "you know",
     ]
 
+    # Token sets for whole-word matching (substring checks let "will" match "willing")
+    _TOKEN_RE = re.compile(r"[a-z']+")
+    _STRONG_SET = frozenset(STRONG_WORDS)
+    _WEAK_SET = frozenset(w for w in WEAK_WORDS if " " not in w)
+    _WEAK_PHRASES = tuple(w for w in WEAK_WORDS if " " in w)
+
+    # Transcripts longer than this are ranked in the process pool
+    ASYNC_RANK_THRESHOLD = 2000
+
     def __init__(self, job_id: Optional[str] = None):
         self.job_id = job_id
 
@@ -460,13 +512,15 @@ Avoid:
         for i, seg in enumerate(transcript_segments):
             text = seg.get("text", "").strip()
             if len(text) > 5:  # Skip very short segments
+                start = seg.get("start") or 0
+                end = seg.get("end") or 0
                 segments_text.append(
                     {
                         "index": i,
                         "text": text,
-                        "start": seg.get("start") or 0,
-                        "end": seg.get("end") or 0,
-                        "duration": (seg.get("end") or 0) - (seg.get("start") or 0),
+                        "start": start,
+                        "end": end,
+                        "duration": end - start,
                     }
                 )
 
@@ -475,16 +529,17 @@ Avoid:
             return []
 
         # Limit to top pre-scored segments for efficiency
-        pre_scored = self.rank_all_lines(transcript_segments)
+        pre_scored = await self.rank_all_lines_async(transcript_segments)
         top_candidates = [s for s in pre_scored if (s.get("quick_score") or 0) > 0.4][:50]
 
         if not top_candidates:
             top_candidates = pre_scored[:30]  # Fallback
 
-        # Prepare for GPT
+        # Prepare for GPT (index refers to top_candidates, which is how the
+        # selections are mapped back below)
         candidate_text = [
             {
-                "index": transcript_segments.index(s) if s in transcript_segments else i,
+                "index": i,
                 "text": s.get("text", ""),
                 "start": s.get("start") or 0,
                 "end": s.get("end") or 0,
@@ -501,7 +556,7 @@ Trailer Duration: {trailer_duration_sec} seconds
 Maximum Lines to Select: {max_lines}
 
 CANDIDATE DIALOGUE (pre-scored by heuristics):
-{json.dumps(candidate_text, indent=2)}
+{_dumps_indented(candidate_text)}
 
 Select up to {max_lines} best lines for a trailer. For each, provide:
 - index: The segment index from the candidates
@@ -569,6 +624,52 @@ Return JSON:
         Returns:
             Segments with added quick_score field, sorted by score descending
         """
+        scored = self._score_lines(transcript_segments)
+
+        # Sort by score descending
+        scored.sort(key=lambda x: x["quick_score"], reverse=True)
+        return scored
+
+    async def rank_all_lines_async(
+        self,
+        transcript_segments: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Async variant of rank_all_lines that keeps the event loop free.
+
+        Small transcripts are scored inline. Large ones are split into
+        chunks and scored across the shared process pool.
+
+        Args:
+            transcript_segments: List of transcript segments
+
+        Returns:
+            Segments with added quick_score field, sorted by score descending
+        """
+        if len(transcript_segments) < self.ASYNC_RANK_THRESHOLD:
+            return self.rank_all_lines(transcript_segments)
+
+        pool = get_process_pool()
+        workers = container_cpus()
+        chunk_size = -(-len(transcript_segments) // workers)
+        chunks = [
+            transcript_segments[i : i + chunk_size]
+            for i in range(0, len(transcript_segments), chunk_size)
+        ]
+
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *[loop.run_in_executor(pool, self._score_lines, chunk) for chunk in chunks]
+        )
+
+        scored = [seg for chunk in results for seg in chunk]
+        scored.sort(key=lambda x: x["quick_score"], reverse=True)
+        return scored
+
+    def _score_lines(
+        self,
+        transcript_segments: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Attach quick_score to each segment (unsorted)."""
         scored = []
 
         for seg in transcript_segments:
@@ -582,8 +683,6 @@ Return JSON:
                 }
             )
 
-        # Sort by score descending
-        scored.sort(key=lambda x: x["quick_score"], reverse=True)
         return scored
 
     def _quick_score(self, text: str) -> float:
@@ -601,6 +700,8 @@ Return JSON:
         score = 0.5  # Base score
         words = text.split()
         text_lower = text.lower()
+        token_list = self._TOKEN_RE.findall(text_lower)
+        tokens = set(token_list)
 
         # Length scoring (trailer lines are 3-15 words)
         word_count = len(words)
@@ -620,17 +721,26 @@ Return JSON:
             score += 0.1
 
         # Strong words
-        if any(w in text_lower for w in self.STRONG_WORDS):
+        if tokens & self._STRONG_SET:
             score += 0.15
 
-        # Weak words (penalty)
-        if any(w in text_lower for w in self.WEAK_WORDS):
+        # Weak words (penalty); multi-word phrases matched on token boundaries
+        if tokens & self._WEAK_SET:
             score -= 0.15
+        else:
+            joined = f" {' '.join(token_list)} "
+            if any(f" {p} " in joined for p in self._WEAK_PHRASES):
+                score -= 0.15
+
+        # Penalties are done; remaining checks only add to the score
+        if score >= 1.0:
+            return 1.0
 
         # All caps words (emphasis)
-        caps_words = [w for w in words if w.isupper() and len(w) > 1]
-        if caps_words:
+        if any(w.isupper() and len(w) > 1 for w in words):
             score += 0.1
+            if score >= 1.0:
+                return 1.0
 
         # Personal pronouns (character moment)
         if any(p in f" {text_lower} " for p in [" i ", " you ", " we "]):
@@ -644,6 +754,92 @@ Return JSON:
 # ============================================
 
 
+# librosa is heavy to import and JIT-compiles on first use, so both costs are
+# paid once per process (shared by every BeatSyncEditor) rather than per job.
+_LIBROSA = None
+_LIBROSA_LOCK = threading.Lock()
+_WARMUP_STARTED = False
+
+# Thread pool for CPU-bound audio analysis (shared by every BeatSyncEditor)
+_AUDIO_POOL = ThreadPoolExecutor(
+    max_workers=max(1, container_cpus() // 2), thread_name_prefix="beat-audio"
+)
+
+# BLAS/OpenMP thread cap while audio jobs run: the pool already runs stages
+# concurrently, and multi-threaded BLAS on top of that oversubscribes the CPU.
+# threadpoolctl limits are process-wide, so overlapping jobs share one limit
+# that is lifted when the last of them finishes
+_BLAS_LIMIT_LOCK = threading.Lock()
+_blas_limit_users = 0
+_blas_limiter = None
+
+
+def _run_blas_capped(fn, *args):
+    """Run fn(*args) with BLAS/OpenMP capped to one thread (if threadpoolctl is available)."""
+    global _blas_limit_users, _blas_limiter
+    if threadpool_limits is None:
+        return fn(*args)
+
+    with _BLAS_LIMIT_LOCK:
+        if _blas_limit_users == 0:
+            _blas_limiter = threadpool_limits(limits=1)
+        _blas_limit_users += 1
+    try:
+        return fn(*args)
+    finally:
+        with _BLAS_LIMIT_LOCK:
+            _blas_limit_users -= 1
+            if _blas_limit_users == 0:
+                _blas_limiter.restore_original_limits()
+                _blas_limiter = None
+
+
+def _get_librosa():
+    """Lazy import librosa (heavy dependency), once per process."""
+    global _LIBROSA
+    if _LIBROSA is None:
+        with _LIBROSA_LOCK:
+            if _LIBROSA is None:
+                try:
+                    import librosa
+                except ImportError:
+                    raise RuntimeError(
+                        "librosa not installed. Add 'librosa>=0.10.0' to requirements."
+                    )
+                _LIBROSA = librosa
+    return _LIBROSA
+
+
+def _warm_up_beat_analysis():
+    """Import librosa and JIT-compile the beat analysis path on a short signal."""
+    try:
+        librosa = _get_librosa()
+        from .beat_kernels import peak_pick_fast
+
+        sr, hop_length = 22050, 512
+        y = np.random.default_rng(0).standard_normal(2 * sr).astype(np.float32)
+        onset_env, beat_onset_env, _, _ = BeatSyncEditor()._onsets_from_blocks(
+            [y], sr, 2048, hop_length
+        )
+        librosa.beat.beat_track(onset_envelope=beat_onset_env, sr=sr, hop_length=hop_length)
+        peak_pick_fast(onset_env, 3, 3, 3, 5, np.float32(0.5), 10)
+    except Exception as e:
+        # Best effort: the first real analysis just pays the cost instead
+        print(f"[BeatSync] Warm-up skipped: {e}")
+
+
+def _start_beat_warmup():
+    """Start the warm-up in a background thread (first call only)."""
+    global _WARMUP_STARTED
+    with _LIBROSA_LOCK:
+        if _WARMUP_STARTED:
+            return
+        _WARMUP_STARTED = True
+    threading.Thread(
+        target=_warm_up_beat_analysis, name="beat-warmup", daemon=True
+    ).start()
+
+
 class BeatSyncEditor:
     """Align video cuts to music beats using librosa.
 
@@ -651,28 +847,76 @@ class BeatSyncEditor:
     then adjusts clip cut points to align with musical beats.
     """
 
+    # Seconds of audio decoded per block when streaming music files
+    STREAM_BLOCK_SEC = 30
+
+    # On-disk cache of analysis results, keyed by audio content hash.
+    # Bump the version whenever the analysis output changes.
+    BEAT_CACHE_DIR = "/tmp/beatcache"
+    BEAT_CACHE_VERSION = 4
+
+    # Energy curve values are stored as uint8 levels; multiply by this to get 0-1
+    ENERGY_SCALE = 1 / 255
+
+    # Meters the madmom downbeat tracker may choose between
+    BEATS_PER_BAR = [3, 4]
+
     def __init__(self, job_id: Optional[str] = None):
         self.job_id = job_id
-        self._librosa = None
         self._numpy = None
+        self._madmom_downbeats = None
+        _start_beat_warmup()
 
     def _log(self, msg: str):
         """Log with job ID prefix."""
         prefix = f"[{self.job_id}]" if self.job_id else "[BeatSync]"
         print(f"{prefix} {msg}")
 
-    def _get_librosa(self):
-        """Lazy import librosa (heavy dependency)."""
-        if self._librosa is None:
+    def _get_madmom_downbeats(self):
+        """Lazy import madmom's downbeat processors (optional dependency).
+
+        Returns:
+            (RNNDownBeatProcessor, DBNDownBeatTrackingProcessor) classes, or
+            None when madmom is not installed
+        """
+        if self._madmom_downbeats is None:
             try:
-                import librosa
+                from madmom.features.downbeats import (
+                    DBNDownBeatTrackingProcessor,
+                    RNNDownBeatProcessor,
+                )
 
-                self._librosa = librosa
+                self._madmom_downbeats = (RNNDownBeatProcessor, DBNDownBeatTrackingProcessor)
             except ImportError:
-                raise RuntimeError(
-                    "librosa not installed. Add 'librosa>=0.10.0' to requirements."
-                )
-        return self._librosa
+                self._madmom_downbeats = False
+        return self._madmom_downbeats or None
+
+    def _track_downbeats(self, music_path: str) -> Optional[np.ndarray]:
+        """Joint beat/downbeat tracking with madmom's RNN + DBN.
+
+        Args:
+            music_path: Path to music file
+
+        Returns:
+            Array of shape (n_beats, 2) with (time, position in bar), or None
+            if madmom is unavailable or fails on this file
+        """
+        processors = self._get_madmom_downbeats()
+        if processors is None:
+            return None
+
+        rnn_cls, dbn_cls = processors
+        try:
+            activations = rnn_cls()(music_path)
+            dbn = dbn_cls(beats_per_bar=self.BEATS_PER_BAR, fps=100)
+            beats = np.asarray(dbn(activations), dtype=np.float64)
+        except Exception as e:
+            self._log(f"madmom downbeat tracking failed, using librosa: {e}")
+            return None
+
+        if beats.ndim != 2 or len(beats) == 0:
+            return None
+        return beats
 
     async def analyze_music_beats(
         self,
@@ -686,98 +930,394 @@ class BeatSyncEditor:
             target_fps: Video frame rate for frame-accurate beat alignment
 
         Returns:
-            Dict with:
+            Dict with (arrays are float32 ndarrays; use to_jsonable() before
+            serializing):
                 - tempo: BPM
                 - beat_times: All beat timestamps (seconds)
                 - downbeat_times: First beat of each measure (seconds)
                 - peak_times: Impact/peak moment timestamps
                 - duration: Total audio duration
-                - energy_curve: {times, values} for intensity matching
+                - energy_curve: {times, values (uint8 levels), scale,
+                  frame_rate} for intensity matching (energy = values * scale)
         """
-        librosa = self._get_librosa()
+        # Cache lookup hashes the file (and may import madmom), so it runs
+        # on the audio pool too
+        loop = asyncio.get_running_loop()
+        cache_path, cached = await loop.run_in_executor(
+            _AUDIO_POOL, self._lookup_cached_analysis, music_path, target_fps
+        )
+        if cached is not None:
+            self._log(f"Using cached beat analysis for {music_path}")
+            return cached
+
+        librosa = _get_librosa()
+        from .beat_kernels import peak_pick_fast
 
         self._log(f"Analyzing music beats in {music_path}")
 
-        # Load audio (22050 Hz is efficient for beat tracking)
-        y, sr = librosa.load(music_path, sr=22050)
-        duration = len(y) / sr
+        # Decode + spectral analysis run on the audio pool (22050 Hz is
+        # efficient for beat tracking)
+        sr = 22050
+        hop_length = 512
+        onset_env, beat_onset_env, rms, n_samples = await loop.run_in_executor(
+            _AUDIO_POOL, _run_blas_capped, self._compute_onsets, music_path, sr, 2048, hop_length
+        )
+        duration = n_samples / sr
+
+        # Beat tracking, peak picking and (optional) madmom downbeat tracking
+        # only share read-only inputs, so run them concurrently on the audio pool
+        (tempo, beat_frames), peaks, madmom_beats = await asyncio.gather(
+            loop.run_in_executor(
+                _AUDIO_POOL,
+                _run_blas_capped,
+                functools.partial(
+                    librosa.beat.beat_track,
+                    onset_envelope=beat_onset_env,
+                    sr=sr,
+                    hop_length=hop_length,
+                ),
+            ),
+            loop.run_in_executor(
+                _AUDIO_POOL, peak_pick_fast, onset_env, 3, 3, 3, 5, np.float32(0.5), 10
+            ),
+            loop.run_in_executor(
+                _AUDIO_POOL, _run_blas_capped, self._track_downbeats, music_path
+            ),
+        )
 
-        # Beat detection
-        tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
-        beat_times = librosa.frames_to_time(beat_frames, sr=sr)
+        # Plain float tempo (newer librosa versions return a 1-element array)
+        tempo = float(np.ravel(tempo)[0]) if np.size(tempo) else 120.0
 
-        # Handle tempo being an array (newer librosa versions)
-        if hasattr(tempo, "__len__"):
-            tempo = float(tempo[0]) if len(tempo) > 0 else 120.0
+        if madmom_beats is not None:
+            # Beats and bar positions from one model pass (meter-aware)
+            beat_times = madmom_beats[:, 0]
+            downbeat_times = madmom_beats[madmom_beats[:, 1] == 1, 0]
         else:
-            tempo = float(tempo)
-
-        # Downbeat detection (first beat of each measure, assuming 4/4 time)
-        downbeat_times = beat_times[::4] if len(beat_times) > 0 else np.array([])
+            beat_times = librosa.frames_to_time(beat_frames, sr=sr)
+            # Downbeat detection (first beat of each measure, assuming 4/4 time)
+            downbeat_times = beat_times[::4] if len(beat_times) > 0 else np.array([])
 
         # Energy envelope (RMS) for intensity matching
-        rms = librosa.feature.rms(y=y)[0]
-        rms_times = librosa.frames_to_time(np.arange(len(rms)), sr=sr)
-
-        # Normalize RMS to 0-1
-        if rms.max() > 0:
-            rms_normalized = rms / rms.max()
-        else:
-            rms_normalized = rms
-
-        # Peak/onset detection for impact moments
-        onset_env = librosa.onset.onset_strength(y=y, sr=sr)
-        peaks = librosa.util.peak_pick(
-            onset_env,
-            pre_max=3,
-            post_max=3,
-            pre_avg=3,
-            post_avg=5,
-            delta=0.5,
-            wait=10,
-        )
+        energy_frame_rate = sr / hop_length  # energy frames are uniformly spaced
+        rms_times = librosa.frames_to_time(
+            np.arange(len(rms), dtype=np.int32), sr=sr
+        ).astype(np.float32)
+
+        # Normalize RMS to 0-1 in place (rms is a fresh array owned here), then
+        # quantize to 8 bits: plenty for intensity matching, 4x smaller to
+        # cache and serialize
+        rms_max = rms.max() if len(rms) else 0.0
+        if rms_max > 0:
+            np.divide(rms, rms_max, out=rms)
+        np.multiply(rms, 255, out=rms)
+        energy_levels = np.rint(rms, out=rms).astype(np.uint8)
+
+        # Peak/onset times for impact moments
         peak_times = librosa.frames_to_time(peaks, sr=sr)
 
-        # Snap times to frame boundaries for video sync
+        # Snap times to frame boundaries for video sync (one pass over all three)
         frame_duration = 1.0 / target_fps
-        beat_times = self._snap_to_frames(beat_times, frame_duration)
-        downbeat_times = self._snap_to_frames(downbeat_times, frame_duration)
-        peak_times = self._snap_to_frames(peak_times, frame_duration)
+        n_beats, n_downbeats = len(beat_times), len(downbeat_times)
+        snapped = self._snap_to_frames(
+            np.concatenate([beat_times, downbeat_times, peak_times]),
+            frame_duration,
+            inv=float(target_fps),
+        )
+        snapped = snapped.astype(np.float32)
+        beat_times = snapped[:n_beats]
+        downbeat_times = snapped[n_beats : n_beats + n_downbeats]
+        peak_times = snapped[n_beats + n_downbeats :]
 
         self._log(
             f"Found tempo={tempo:.1f} BPM, {len(beat_times)} beats, "
             f"{len(downbeat_times)} downbeats, {len(peak_times)} peaks"
         )
 
+        await loop.run_in_executor(_AUDIO_POOL, functools.partial(
+            self._save_cached_analysis,
+            cache_path,
+            tempo=tempo,
+            beat_times=beat_times,
+            downbeat_times=downbeat_times,
+            peak_times=peak_times,
+            duration=duration,
+            energy_times=rms_times,
+            energy_values=energy_levels,
+            energy_frame_rate=energy_frame_rate,
+        ))
+
         return {
             "tempo": tempo,
-            "beat_times": beat_times.tolist(),
-            "downbeat_times": downbeat_times.tolist(),
-            "peak_times": peak_times.tolist(),
+            "beat_times": beat_times,
+            "downbeat_times": downbeat_times,
+            "peak_times": peak_times,
             "duration": float(duration),
             "energy_curve": {
-                "times": rms_times.tolist(),
-                "values": rms_normalized.tolist(),
+                "times": rms_times,
+                "values": energy_levels,
+                "scale": self.ENERGY_SCALE,
+                "frame_rate": energy_frame_rate,
             },
         }
 
+    def _lookup_cached_analysis(
+        self, music_path: str, target_fps: float
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Cache path for a music file plus its cached analysis (None on miss)."""
+        cache_path = self._beat_cache_path(music_path, target_fps)
+        return cache_path, self._load_cached_analysis(cache_path)
+
+    def _beat_cache_path(self, music_path: str, target_fps: float) -> Optional[str]:
+        """Content-addressed cache path for a music file's beat analysis.
+
+        Hashes the file size plus its first and last 64 KiB, which is cheap
+        and distinguishes generated tracks without reading the whole file.
+        """
+        try:
+            size = os.path.getsize(music_path)
+            h = hashlib.blake2b(digest_size=16)
+            h.update(size.to_bytes(8, "little"))
+            with open(music_path, "rb") as f:
+                h.update(f.read(65536))
+                f.seek(max(size - 65536, 0))
+                h.update(f.read(65536))
+        except OSError as e:
+            self._log(f"Beat cache disabled for {music_path}: {e}")
+            return None
+
+        # Results differ by beat tracker, so keep their cache entries apart
+        backend = "madmom" if self._get_madmom_downbeats() else "librosa"
+        return os.path.join(
+            self.BEAT_CACHE_DIR,
+            f"{h.hexdigest()}_{target_fps:g}_{backend}_v{self.BEAT_CACHE_VERSION}.npz",
+        )
+
+    def _load_cached_analysis(self, cache_path: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Load a cached analysis result, or None on miss."""
+        if not cache_path or not os.path.exists(cache_path):
+            return None
+        try:
+            with np.load(cache_path) as data:
+                return {
+                    "tempo": float(data["tempo"]),
+                    "beat_times": data["beat_times"],
+                    "downbeat_times": data["downbeat_times"],
+                    "peak_times": data["peak_times"],
+                    "duration": float(data["duration"]),
+                    "energy_curve": {
+                        "times": data["energy_times"],
+                        "values": data["energy_values"],
+                        "scale": self.ENERGY_SCALE,
+                        "frame_rate": float(data["energy_frame_rate"]),
+                    },
+                }
+        except Exception as e:
+            self._log(f"Ignoring unreadable beat cache {cache_path}: {e}")
+            return None
+
+    def _save_cached_analysis(self, cache_path: Optional[str], **arrays):
+        """Persist an analysis result (best effort, atomic rename)."""
+        if not cache_path:
+            return
+        tmp_path = None
+        try:
+            os.makedirs(self.BEAT_CACHE_DIR, exist_ok=True)
+            # Unique per writer: concurrent analyses of one track run on
+            # separate audio pool threads
+            fd, tmp_path = tempfile.mkstemp(dir=self.BEAT_CACHE_DIR, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self._log(f"Failed to write beat cache {cache_path}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _compute_onsets(self, music_path: str, sr: int, n_fft: int, hop_length: int):
+        """Decode music and derive onset envelopes and RMS from one shared STFT.
+
+        Returns:
+            Tuple of (onset_env (mean, for peak picking), beat_onset_env
+            (median, what beat_track expects), rms, n_samples)
+        """
+        return self._onsets_from_blocks(
+            self._iter_audio_blocks(music_path, sr), sr, n_fft, hop_length
+        )
+
+    def _onsets_from_blocks(self, blocks, sr: int, n_fft: int, hop_length: int):
+        """Onset envelopes and RMS for already-decoded mono blocks at sr."""
+        librosa = _get_librosa()
+        from .beat_kernels import onset_from_logmel
+
+        mel_power, rms, n_samples = self._stream_features(blocks, sr, n_fft, hop_length)
+        log_mel = librosa.power_to_db(mel_power)
+        onset_env, beat_onset_env = onset_from_logmel(
+            log_mel, 1 + n_fft // (2 * hop_length)
+        )
+        return onset_env, beat_onset_env, rms, n_samples
+
+    def _iter_audio_blocks(self, music_path: str, target_sr: int):
+        """Yield the decoded audio as mono float32 blocks at target_sr.
+
+        Decodes with soundfile STREAM_BLOCK_SEC at a time, downmixes, and
+        feeds each block through a streaming soxr resampler, so the full
+        signal is never held in memory. 16-bit PCM WAV samples are read from
+        a memory map instead of through libsndfile. Falls back to
+        librosa.load for formats libsndfile cannot decode.
+        """
+        try:
+            import soundfile as sf
+            import soxr
+
+            audio_file = sf.SoundFile(music_path)
+        except Exception as e:
+            self._log(f"soundfile open failed ({e}), falling back to librosa.load")
+            y, _ = _get_librosa().load(music_path, sr=target_sr)
+            step = target_sr * self.STREAM_BLOCK_SEC
+            for i in range(0, len(y), step):
+                yield y[i : i + step]
+            return
+
+        with audio_file:
+            resampler = None
+            if audio_file.samplerate != target_sr:
+                resampler = soxr.ResampleStream(
+                    audio_file.samplerate, target_sr, 1, dtype="float32", quality="HQ"
+                )
+
+            block_frames = audio_file.samplerate * self.STREAM_BLOCK_SEC
+            pcm = None
+            if audio_file.format == "WAV" and audio_file.subtype == "PCM_16":
+                pcm = self._map_wav_pcm16(music_path, audio_file.channels, audio_file.frames)
+
+            if pcm is not None:
+                # Convert straight from the page cache, skipping libsndfile's
+                # read buffer (same scaling libsndfile applies)
+                blocks = (
+                    pcm[i : i + block_frames].astype(np.float32) * np.float32(1 / 32768)
+                    for i in range(0, len(pcm), block_frames)
+                )
+            else:
+                blocks = audio_file.blocks(
+                    blocksize=block_frames, dtype="float32", always_2d=True
+                )
+
+            for block in blocks:
+                if block.shape[1] > 1:
+                    mono = block.mean(axis=1, dtype=np.float32)
+                else:
+                    mono = np.ascontiguousarray(block[:, 0])
+                del block
+                yield resampler.resample_chunk(mono) if resampler else mono
+
+            if resampler:
+                yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+    def _map_wav_pcm16(
+        self, music_path: str, channels: int, frames: int
+    ) -> Optional[np.ndarray]:
+        """Memory-map the sample data of a 16-bit PCM WAV file.
+
+        Args:
+            music_path: Path to a WAV file soundfile reported as PCM_16
+            channels: Channel count from the file header
+            frames: Frame count from the file header
+
+        Returns:
+            Read-only int16 view of shape (frames, channels), or None if the
+            data chunk can't be located (e.g. RF64) and callers should read
+            through soundfile instead
+        """
+        try:
+            with open(music_path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            self._log(f"mmap failed for {music_path}: {e}")
+            return None
+
+        if mm[:4] != b"RIFF" or mm[8:12] != b"WAVE":
+            return None
+
+        # Walk RIFF chunks (word-aligned) to the "data" chunk
+        pos = 12
+        while pos + 8 <= len(mm):
+            chunk_id = mm[pos : pos + 4]
+            chunk_size = int.from_bytes(mm[pos + 4 : pos + 8], "little")
+            if chunk_id == b"data":
+                n_bytes = frames * channels * 2
+                if pos + 8 + n_bytes > len(mm):
+                    return None
+                pcm = np.frombuffer(mm, dtype="<i2", count=frames * channels, offset=pos + 8)
+                return pcm.reshape(frames, channels)
+            pos += 8 + chunk_size + (chunk_size & 1)
+
+        return None
+
+    def _stream_features(self, blocks, sr: int, n_fft: int, hop_length: int):
+        """Compute mel power and RMS per frame from streamed audio blocks.
+
+        Frames match librosa's centered, zero-padded framing exactly: a
+        rolling buffer carries the samples a frame shares with the next
+        block, so only the mel spectrogram (8x smaller than the STFT) and
+        the RMS curve are kept for the whole track.
+
+        Returns:
+            Tuple of (mel_power [n_mels, n_frames], rms [n_frames], n_samples)
+        """
+        librosa = _get_librosa()
+        from .beat_kernels import rms_from_signal
+
+        mel_basis = librosa.filters.mel(sr=sr, n_fft=n_fft)
+        pad = np.zeros(n_fft // 2, dtype=np.float32)
+        mel_parts: List[np.ndarray] = []
+        rms_parts: List[np.ndarray] = []
+
+        def consume(buf: np.ndarray) -> np.ndarray:
+            """Analyze every complete frame in buf and return the remainder."""
+            if len(buf) < n_fft:
+                return buf
+            n_frames = 1 + (len(buf) - n_fft) // hop_length
+            seg = buf[: (n_frames - 1) * hop_length + n_fft]
+            mag = np.abs(
+                librosa.stft(seg, n_fft=n_fft, hop_length=hop_length, center=False)
+            )
+            mel_parts.append(mel_basis @ (mag * mag))
+            rms_parts.append(rms_from_signal(seg, n_fft, hop_length, False))
+            return buf[n_frames * hop_length :]
+
+        buf = pad
+        n_samples = 0
+        for block in blocks:
+            n_samples += len(block)
+            buf = consume(np.concatenate([buf, block]))
+        consume(np.concatenate([buf, pad]))
+
+        return np.concatenate(mel_parts, axis=1), np.concatenate(rms_parts), n_samples
+
     def _snap_to_frames(
         self,
         times: np.ndarray,
         frame_duration: float,
+        inv: Optional[float] = None,
     ) -> np.ndarray:
         """Snap times to nearest video frame boundary.
 
         Args:
             times: Array of timestamps
             frame_duration: Duration of one video frame (1/fps)
+            inv: Optional precomputed 1/frame_duration (i.e. fps)
 
         Returns:
-            Times snapped to frame boundaries
+            Times snapped to frame boundaries (new array, single buffer)
         """
         if len(times) == 0:
             return times
-        return np.round(times / frame_duration) * frame_duration
+        if inv is None:
+            inv = 1.0 / frame_duration
+        out = np.multiply(times, inv)
+        np.rint(out, out=out)
+        np.multiply(out, frame_duration, out=out)
+        return out
 
     async def align_cuts_to_beats(
         self,
@@ -805,61 +1345,97 @@ class BeatSyncEditor:
         else:  # "beat"
             reference_times = beat_analysis.get("beat_times", [])
 
-        if not reference_times:
+        if len(reference_times) == 0:
             self._log("No beats to align to, returning original clips")
             return clips
 
-        aligned_clips = []
+        # Structure-of-arrays view of the clips. Nearest beats for every
+        # original cut point are resolved in one batch; these candidates are
+        # exact while no adjustment has accumulated, after which we fall back
+        # to per-clip lookups.
+        ref = np.asarray(reference_times, dtype=np.float64)
+        starts = np.array([clip.get("targetStart") or 0 for clip in clips], dtype=np.float64)
+        ends = np.array([clip.get("targetEnd") or 0 for clip in clips], dtype=np.float64)
+        candidates = self._find_nearest_batch(ends, ref).tolist()
+
+        # Only the cumulative adjustment is sequential: walk it over plain floats
+        offsets = []
+        new_ends = []
+        adjustments = []
+        aligned = []
         cumulative_adjustment = 0.0
         alignments_made = 0
 
-        for i, clip in enumerate(clips):
-            clip_copy = clip.copy()
-
-            # Calculate adjusted positions
-            target_start = (clip.get("targetStart") or 0) + cumulative_adjustment
-            target_end = (clip.get("targetEnd") or 0) + cumulative_adjustment
+        for i, end in enumerate(ends.tolist()):
+            offsets.append(cumulative_adjustment)
+            target_end = end + cumulative_adjustment
 
             # Find nearest beat to the current cut point (end of clip)
-            nearest_beat = self._find_nearest(target_end, reference_times)
+            if cumulative_adjustment == 0.0:
+                nearest_beat = candidates[i]
+            else:
+                nearest_beat = self._find_nearest(target_end, ref)
 
             # Only adjust if within tolerance
             adjustment = nearest_beat - target_end
 
             if abs(adjustment) <= max_adjustment:
                 # Adjust this clip's end and accumulate for next clips
-                clip_copy["targetEnd"] = nearest_beat
-                clip_copy["beat_aligned"] = True
-                clip_copy["alignment_adjustment"] = adjustment
+                new_ends.append(nearest_beat)
+                aligned.append(True)
+                adjustments.append(adjustment)
                 cumulative_adjustment += adjustment
                 alignments_made += 1
             else:
-                clip_copy["targetEnd"] = target_end
-                clip_copy["beat_aligned"] = False
-                clip_copy["alignment_adjustment"] = 0
+                new_ends.append(target_end)
+                aligned.append(False)
+                adjustments.append(0)
 
-            clip_copy["targetStart"] = target_start
-            aligned_clips.append(clip_copy)
+        new_starts = (starts + np.array(offsets)).tolist()
+        aligned_clips = [
+            {
+                **clip,
+                "targetStart": start,
+                "targetEnd": end,
+                "beat_aligned": is_aligned,
+                "alignment_adjustment": adjustment,
+            }
+            for clip, start, end, is_aligned, adjustment in zip(
+                clips, new_starts, new_ends, aligned, adjustments
+            )
+        ]
 
         self._log(f"Aligned {alignments_made}/{len(clips)} cuts to beats")
         return aligned_clips
 
-    def _find_nearest(self, time: float, reference_times: List[float]) -> float:
+    def _find_nearest(self, time: float, reference_times: np.ndarray) -> float:
         """Find the nearest reference time to a given time.
 
         Args:
             time: Target time
-            reference_times: List of reference beat times
+            reference_times: Reference beat times (pass an ndarray to avoid
+                re-allocating on every call)
 
         Returns:
             Nearest reference time
         """
-        if not reference_times:
+        if len(reference_times) == 0:
             return time
 
-        arr = np.array(reference_times)
-        idx = np.abs(arr - time).argmin()
-        return reference_times[idx]
+        arr = np.asarray(reference_times)
+        return float(arr[_nearest_index(arr, time)])
+
+    def _find_nearest_batch(self, targets: np.ndarray, ref: np.ndarray) -> np.ndarray:
+        """Find the nearest reference time for every target at once.
+
+        Args:
+            targets: Array of target times
+            ref: Non-empty, sorted array of reference beat times
+
+        Returns:
+            Array of nearest reference times, one per target
+        """
+        return ref[_nearest_index(ref, targets)]
 
     async def generate_cut_suggestions(
         self,
@@ -882,7 +1458,7 @@ class BeatSyncEditor:
         Returns:
             List of suggested clips with beat-aligned timestamps
         """
-        downbeats = beat_analysis.get("downbeat_times", [])
+        downbeats = np.asarray(beat_analysis.get("downbeat_times", []), dtype=np.float64)
         tempo = beat_analysis.get("tempo", 120)
 
         # Calculate ideal number of cuts based on tempo
@@ -896,17 +1472,18 @@ class BeatSyncEditor:
 
         target_cuts = int((target_duration / 60) * cuts_per_minute)
 
-        # Prioritize high-scoring scenes
-        sorted_scenes = sorted(
-            scene_scores,
-            key=lambda s: (s.get("importanceScores") or {}).get("combined") or 0,
-            reverse=True,
+        # Prioritize high-scoring scenes (only the top target_cuts are used)
+        scores = np.fromiter(
+            (_combined_score(s) for s in scene_scores),
+            dtype=np.float64,
+            count=len(scene_scores),
         )
+        top_scenes = [scene_scores[i] for i in _top_k_indices(scores, target_cuts)]
 
         suggestions = []
         used_time = 0.0
 
-        for scene in sorted_scenes[:target_cuts]:
+        for scene in top_scenes:
             if used_time >= target_duration:
                 break
 
@@ -966,19 +1543,51 @@ class BeatSyncEditor:
             Energy level (0-1)
         """
         energy_curve = beat_analysis.get("energy_curve", {})
-        times = energy_curve.get("times", [])
+        frame_rate = energy_curve.get("frame_rate")
         values = energy_curve.get("values", [])
 
-        if not times or not values:
-            return 0.5
+        # Uniform frames: index directly, no search or allocation
+        if frame_rate and len(values) > 0:
+            idx = min(max(round(time * frame_rate), 0), len(values) - 1)
+            return float(values[idx]) * energy_curve.get("scale", 1.0)
+
+        return float(self.get_energy_at_times(beat_analysis, np.array([time]))[0])
+
+    def get_energy_at_times(
+        self,
+        beat_analysis: Dict[str, Any],
+        times: np.ndarray,
+    ) -> np.ndarray:
+        """Get music energy levels at many times in one vectorized lookup.
+
+        Args:
+            beat_analysis: Result from analyze_music_beats
+            times: Array of times in seconds
+
+        Returns:
+            Array of energy levels (0-1), one per time (0.5 where unknown)
+        """
+        times = np.asarray(times, dtype=np.float64)
+        energy_curve = beat_analysis.get("energy_curve", {})
+        curve_times = np.asarray(energy_curve.get("times", []))
+        values = np.asarray(energy_curve.get("values", []))
+        frame_rate = energy_curve.get("frame_rate")
+
+        if len(values) == 0 or (len(curve_times) == 0 and not frame_rate):
+            return np.full(times.shape, 0.5)
+
+        # 8-bit levels are dequantized back to 0-1 after the gather
+        scale = energy_curve.get("scale", 1.0)
 
-        # Find nearest time index
-        arr = np.array(times)
-        idx = np.abs(arr - time).argmin()
+        if frame_rate:
+            # Uniform frames: nearest frame is round(time * frame_rate)
+            idx = np.clip(np.rint(times * frame_rate), 0, len(values) - 1).astype(np.intp)
+            return np.multiply(values[idx], scale, dtype=np.float64)
 
-        if idx < len(values):
-            return float(values[idx])
-        return 0.5
+        # Nearest curve frame for every query (curve times are frame-ordered)
+        idx = _nearest_index(curve_times, times)
+        energy = np.multiply(values[np.minimum(idx, len(values) - 1)], scale, dtype=np.float64)
+        return np.where(idx < len(values), energy, 0.5)
 
 
 # ============================================
@@ -986,6 +1595,69 @@ class BeatSyncEditor:
 # ============================================
 
 
+def _nearest_index(sorted_times: np.ndarray, t):
+    """Index of the nearest entry in a sorted, non-empty array (binary search).
+
+    Ties resolve to the earlier entry, matching np.abs(arr - t).argmin().
+
+    Args:
+        sorted_times: Ascending array of times
+        t: Query time, or array of query times
+
+    Returns:
+        Index (or array of indices) into sorted_times
+    """
+    n = len(sorted_times)
+    if n == 1:
+        return np.zeros(np.shape(t), dtype=np.intp)
+    right = np.clip(np.searchsorted(sorted_times, t), 1, n - 1)
+    left = right - 1
+    return np.where(sorted_times[right] - t < t - sorted_times[left], right, left)
+
+
+def _combined_score(scene: Dict[str, Any]) -> float:
+    """A scene's combined importance score, 0 when missing or None."""
+    scores = scene.get("importanceScores")
+    return (scores.get("combined") if scores else 0.0) or 0.0
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> List[int]:
+    """Indices of the k highest scores, best first, without a full sort.
+
+    Same result as a stable descending sort truncated to k (ties keep their
+    original order), in O(N + k log k).
+    """
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    if k < n:
+        # Everything strictly above the k-th largest score, then the earliest
+        # entries tied with it
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        tied = np.flatnonzero(scores == kth)[: k - len(above)]
+        idx = np.sort(np.concatenate([above, tied]))
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-scores[idx], kind="stable")].tolist()
+
+
+def to_jsonable(obj: Any) -> Any:
+    """Convert NumPy arrays/scalars (e.g. in a beat analysis) to plain Python.
+
+    Beat analysis keeps its arrays as float32 ndarrays internally; call this
+    only where results leave for JSON or list-based code.
+    """
+    if isinstance(obj, dict):
+        return {k: to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_jsonable(v) for v in obj]
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    return obj
+
+
 def create_editing_intelligence(job_id: Optional[str] = None):
     """Factory function to create all editing intelligence components.
 
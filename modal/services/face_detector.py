@@ -13,15 +13,18 @@ Enhanced face detection using MediaPipe with:
 
 import os
 import asyncio
+import queue
 import subprocess
-import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Tuple, Optional
 from dataclasses import dataclass
-from collections import Counter
 
 import cv2
 import numpy as np
 
+from .cpu_utils import container_cpus
+
 
 # =============================================================================
 # CONFIGURATION
@@ -41,6 +44,113 @@ MIN_DETECTION_CONFIDENCE = 0.5
 # Clustering threshold for grouping same person across frames
 FACE_CLUSTER_THRESHOLD = 150  # pixels
 
+# Detection sets at least this large are clustered with the Numba kernel;
+# a clip's usual 10-30 faces cluster faster in Python than the kernel
+# imports and compiles
+CLUSTER_KERNEL_MIN_FACES = 64
+
+# Gaps between sampled frames up to this many frames are skipped by grabbing
+# forward (no decode); longer gaps seek, which restarts decoding at a keyframe
+MAX_GRAB_SKIP_FRAMES = 300
+
+# extract_frames decodes forward through gaps up to this many seconds between
+# requested timestamps; longer gaps seek (restarting decode at a keyframe)
+MAX_DECODE_SKIP_SECONDS = 10.0
+
+# Frames are downscaled to this long edge before detection; MediaPipe's
+# models run at a much smaller input size, and bboxes are relative (0-1)
+DETECT_MAX_DIM = 640
+
+# Frames are downscaled to this long edge before the Haar upper body scan
+UPPER_BODY_MAX_DIM = 480
+
+# Sampled frames are detected in batches, spread over a small thread pool
+# (MediaPipe releases the GIL while running the model)
+DETECT_BATCH_SIZE = 8
+DETECT_WORKERS = 4
+
+# Decoded frames buffered between the reader thread and detection
+DECODE_PREFETCH = 8
+
+# Sampled frames whose 32x32 grayscale thumbnail differs from the last
+# analyzed frame by less than this mean absolute difference (0-255) reuse
+# its detections instead of running MediaPipe again
+FRAME_REUSE_DIFF = 3.0
+
+# Sampled frames are also run through a MOG2 background subtractor (at
+# MOTION_SIZE, reset per clip); when fewer than this fraction of pixels are
+# foreground, nothing moved and the last analyzed frame's detections are
+# reused. Runs of reuse are capped so detections never go too stale
+MOTION_SIZE = (160, 90)
+MOTION_HISTORY = 5
+MOTION_REUSE_FRACTION = 0.008
+MAX_REUSED_SAMPLES = 10
+
+# Thread pool for batched face detection
+_detect_executor = ThreadPoolExecutor(
+    max_workers=DETECT_WORKERS, thread_name_prefix="facedet"
+)
+
+# Thread pool running whole-video detect_faces calls, so several videos can be
+# analyzed at once without competing with unrelated default-executor work.
+# Its threads only drive the reader/batching loop; MediaPipe runs on
+# _detect_executor, so the two pools never wait on each other
+_video_executor = ThreadPoolExecutor(
+    max_workers=max(1, container_cpus() // 2),
+    thread_name_prefix="facedet-video",
+)
+
+
+def _upright(frame: np.ndarray, rotation: int) -> np.ndarray:
+    """Apply a decoded frame's display rotation, as the ffmpeg CLI autorotates.
+
+    PyAV hands back frames as stored, so phone/portrait footage tagged with
+    a display matrix comes out sideways. rotation is PyAV's frame.rotation:
+    degrees counterclockwise, a multiple of 90 in practice.
+    """
+    turns = round(rotation / 90) % 4
+    if turns == 0:
+        return frame
+    return np.ascontiguousarray(np.rot90(frame, turns))
+
+
+def _to_detection_rgb(frame: np.ndarray) -> np.ndarray:
+    """Downscale a BGR frame to DETECT_MAX_DIM (if larger), then convert to RGB.
+
+    Resizing first means the color conversion only touches the small image.
+    The result is marked read-only so MediaPipe's process() takes it by
+    reference instead of copying it into the graph.
+    """
+    h, w = frame.shape[:2]
+    scale = DETECT_MAX_DIM / max(h, w)
+    if scale < 1:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    rgb.flags.writeable = False
+    return rgb
+
+
+# Haar upper body cascade, loaded on first use (False if unavailable)
+_upper_body_cascade = None
+_upper_body_cascade_lock = threading.Lock()
+
+
+def _get_upper_body_cascade() -> Optional["cv2.CascadeClassifier"]:
+    """Load the Haar upper body cascade once per process (None if unavailable)."""
+    global _upper_body_cascade
+    if _upper_body_cascade is None:
+        with _upper_body_cascade_lock:
+            if _upper_body_cascade is None:
+                cascade = False
+                try:
+                    cascade_path = cv2.data.haarcascades + 'haarcascade_upperbody.xml'
+                    if os.path.exists(cascade_path):
+                        cascade = cv2.CascadeClassifier(cascade_path)
+                except Exception:
+                    pass
+                _upper_body_cascade = cascade
+    return _upper_body_cascade or None
+
 
 @dataclass
 class FacePosition:
@@ -67,29 +177,35 @@ class FaceDetector:
     """
 
     def __init__(self):
-        self._detector = None
+        # MediaPipe graphs are not safe to share across threads, so each
+        # thread lazily builds its own face detector
+        self._local = threading.local()
+        # PyAV containers opened by extract_frame_ffmpeg (one per thread),
+        # tracked so they can all be closed with the detector
+        self._av_containers = set()
+        self._av_lock = threading.Lock()
+        # ffprobe results keyed on (path, mtime, size)
+        self._video_info_cache: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
         self._pose_detector = None
-        self._upper_body_cascade = None
-        self._init_upper_body_cascade()
 
-    def _init_upper_body_cascade(self):
-        """Initialize upper body cascade for fallback detection."""
-        try:
-            cascade_path = cv2.data.haarcascades + 'haarcascade_upperbody.xml'
-            if os.path.exists(cascade_path):
-                self._upper_body_cascade = cv2.CascadeClassifier(cascade_path)
-        except Exception:
-            pass
+    def __del__(self):
+        for container in list(getattr(self, "_av_containers", ())):
+            try:
+                container.close()
+            except Exception:
+                pass
 
     def _get_detector(self):
-        """Lazy initialization of MediaPipe face detector."""
-        if self._detector is None:
+        """Lazy initialization of MediaPipe face detector (one per thread)."""
+        detector = getattr(self._local, "detector", None)
+        if detector is None:
             import mediapipe as mp
-            self._detector = mp.solutions.face_detection.FaceDetection(
+            detector = mp.solutions.face_detection.FaceDetection(
                 model_selection=1,  # Full range model
                 min_detection_confidence=MIN_DETECTION_CONFIDENCE,
             )
-        return self._detector
+            self._local.detector = detector
+        return detector
 
     def _get_pose_detector(self):
         """Lazy initialization of MediaPipe pose detector for fallback."""
@@ -105,6 +221,99 @@ class FaceDetector:
                 pass
         return self._pose_detector
 
+    def _get_av_container(self, video_path: str):
+        """Open (or reuse) this thread's PyAV container for video_path.
+
+        The cached container is keyed on path, mtime and size so a file
+        rewritten in place is reopened.
+        """
+        st = os.stat(video_path)
+        key = (video_path, st.st_mtime_ns, st.st_size)
+
+        cached = getattr(self._local, "av_container", None)
+        if cached is not None:
+            cached_key, container = cached
+            if cached_key == key:
+                return container
+            self._local.av_container = None
+            with self._av_lock:
+                self._av_containers.discard(container)
+            container.close()
+
+        import av
+        container = av.open(video_path)
+        self._local.av_container = (key, container)
+        with self._av_lock:
+            self._av_containers.add(container)
+        return container
+
+    def _extract_frames_av(
+        self,
+        video_path: str,
+        timestamps: List[float],
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Decode the first frame at or after each timestamp in-process with PyAV.
+
+        Seeks to the keyframe before the first timestamp and decodes forward,
+        like FFmpeg's input -ss (timestamps are relative to the stream start).
+        Later timestamps within MAX_DECODE_SKIP_SECONDS are reached by
+        decoding on; farther ones seek again.
+
+        Args:
+            video_path: Path to video file
+            timestamps: Times in seconds, in ascending order
+
+        Returns:
+            BGR frame per timestamp (None past the end of the stream),
+            rotated upright per the display matrix like the ffmpeg CLI
+        """
+        container = self._get_av_container(video_path)
+        stream = container.streams.video[0]
+        time_base = stream.time_base
+        start = float(stream.start_time * time_base) if stream.start_time is not None else 0.0
+
+        frames: List[Optional[np.ndarray]] = []
+        decoder = None
+        last_time = None
+        last_frame = None
+
+        for timestamp in timestamps:
+            target = start + timestamp
+
+            # The last decoded frame is already the first one at/after target
+            if last_frame is not None and target <= last_time:
+                frames.append(last_frame)
+                continue
+
+            if decoder is None or last_time is None or target - last_time > MAX_DECODE_SKIP_SECONDS:
+                container.seek(int(target / time_base), stream=stream, backward=True, any_frame=False)
+                decoder = container.decode(stream)
+
+            last_frame = None
+            for frame in decoder:
+                if frame.time is None:
+                    continue
+                last_time = frame.time
+                if frame.time >= target:
+                    last_frame = _upright(frame.to_ndarray(format="bgr24"), frame.rotation)
+                    break
+
+            if last_frame is None:
+                # Stream ended; any later timestamp needs a fresh seek
+                decoder = None
+            frames.append(last_frame)
+
+        return frames
+
+    def _extract_frame_av(
+        self,
+        video_path: str,
+        timestamp: float,
+    ) -> Optional[np.ndarray]:
+        """Decode the first frame at or after timestamp in-process with PyAV."""
+        return self._extract_frames_av(video_path, [timestamp])[0]
+
     def extract_frame_ffmpeg(
         self,
         video_path: str,
@@ -112,30 +321,64 @@ class FaceDetector:
     ) -> Optional[np.ndarray]:
         """
         Extract frame using FFmpeg - works with all codecs including AV1.
+
+        Decodes in-process through PyAV (FFmpeg's libraries) on a cached
+        container; the ffmpeg CLI + temp JPEG path is only used if that fails.
         """
         try:
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-                tmp_path = tmp.name
+            return self._extract_frame_av(video_path, timestamp)
+        except Exception as e:
+            print(f"PyAV frame extraction failed, using ffmpeg: {e}")
 
+        try:
+            # Lossless BMP piped over stdout: no temp file and no JPEG loss.
+            # BMP carries its own dimensions, so autorotated frames decode right
             cmd = [
-                'ffmpeg', '-y',
+                'ffmpeg',
                 '-ss', str(timestamp),
                 '-i', video_path,
                 '-vframes', '1',
-                '-q:v', '2',
-                tmp_path
+                '-f', 'image2pipe',
+                '-vcodec', 'bmp',
+                '-',
             ]
-            subprocess.run(cmd, capture_output=True, timeout=30)
+            result = subprocess.run(cmd, capture_output=True, timeout=30)
 
-            if os.path.exists(tmp_path):
-                frame = cv2.imread(tmp_path)
-                os.unlink(tmp_path)
-                return frame
+            if result.returncode == 0 and result.stdout:
+                return cv2.imdecode(np.frombuffer(result.stdout, np.uint8), cv2.IMREAD_COLOR)
             return None
         except Exception as e:
             print(f"FFmpeg frame extraction failed: {e}")
             return None
 
+    def extract_frames(
+        self,
+        video_path: str,
+        timestamps: List[float],
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Extract frames at several timestamps, decoding in one forward pass.
+
+        Timestamps may be in any order; frames come back in the same order.
+        Any frame the PyAV pass could not produce is retried with
+        extract_frame (FFmpeg CLI, then OpenCV).
+        """
+        order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+        frames: List[Optional[np.ndarray]] = [None] * len(timestamps)
+
+        if order:
+            try:
+                decoded = self._extract_frames_av(video_path, [timestamps[i] for i in order])
+                for i, frame in zip(order, decoded):
+                    frames[i] = frame
+            except Exception as e:
+                print(f"PyAV frame extraction failed, extracting one by one: {e}")
+
+        for i, frame in enumerate(frames):
+            if frame is None:
+                frames[i] = self.extract_frame(video_path, timestamps[i])
+        return frames
+
     def extract_frame(
         self,
         video_path: str,
@@ -172,10 +415,10 @@ class FaceDetector:
         Returns:
             Dictionary mapping clip index to face detection results
         """
-        # Run detection in thread pool since OpenCV is blocking
-        loop = asyncio.get_event_loop()
+        # Run detection in the face detection pool since OpenCV is blocking
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
-            None,
+            _video_executor,
             self._detect_faces_sync,
             video_path,
             clip_times,
@@ -200,59 +443,276 @@ class FaceDetector:
         frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         frame_area = frame_width * frame_height
 
-        detector = self._get_detector()
-
         if clip_times is None:
             # Analyze entire video
             clip_times = [(0, total_frames / fps)]
 
-        for clip_idx, (start_time, end_time) in enumerate(clip_times):
+        # A reader thread decodes sampled frames while this thread runs
+        # detection, so the decoder and MediaPipe overlap
+        frame_q: "queue.Queue" = queue.Queue(maxsize=DECODE_PREFETCH)
+        stop = threading.Event()
+        reader = threading.Thread(
+            target=self._read_sampled_frames,
+            args=(cap, fps, clip_times, frame_q, stop),
+            name="facedet-reader",
+            daemon=True,
+        )
+        reader.start()
+
+        try:
             positions = []
-            start_frame = int(start_time * fps)
-            end_frame = int(end_time * fps)
+            batch: List[Tuple[int, np.ndarray]] = []
+            # (frame_idx, analyzed frame_idx whose detections it uses)
+            pending: List[Tuple[int, int]] = []
+            detections: Dict[int, List[Tuple[float, ...]]] = {}
+            last_thumb = None
+            reuse_run = 0
+            last_ref = None
+            sampled = reused = 0
+
+            while True:
+                item = frame_q.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+
+                clip_idx, frame_idx, rgb_frame, thumb, motion = item
+                if rgb_frame is None:
+                    # End of clip: flush and summarize results for this clip
+                    if pending:
+                        positions.extend(
+                            self._flush_detections(batch, pending, detections, last_ref, fps)
+                        )
+                    results[clip_idx] = self._summarize_detections(positions)
+                    positions = []
+                    continue
 
-            frame_idx = start_frame
-            while frame_idx < end_frame:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
+                # Near-identical to the last analyzed frame, or no motion
+                # against the clip's background: reuse its detections
+                sampled += 1
+                if (
+                    last_thumb is not None
+                    and reuse_run < MAX_REUSED_SAMPLES
+                    and (
+                        motion < MOTION_REUSE_FRACTION
+                        or cv2.absdiff(thumb, last_thumb).mean() < FRAME_REUSE_DIFF
+                    )
+                ):
+                    pending.append((frame_idx, last_ref))
+                    reused += 1
+                    reuse_run += 1
+                else:
+                    batch.append((frame_idx, rgb_frame))
+                    pending.append((frame_idx, frame_idx))
+                    last_thumb, last_ref = thumb, frame_idx
+                    reuse_run = 0
+
+                if len(batch) >= DETECT_BATCH_SIZE:
+                    positions.extend(
+                        self._flush_detections(batch, pending, detections, last_ref, fps)
+                    )
+        finally:
+            stop.set()
+            reader.join()
+            cap.release()
+
+        if sampled:
+            print(f"Face detection reused previous results for {reused}/{sampled} sampled frames")
+        return results
 
-                if not ret:
-                    break
+    def _read_sampled_frames(
+        self,
+        cap: "cv2.VideoCapture",
+        fps: float,
+        clip_times: List[Tuple[float, float]],
+        frame_q: "queue.Queue",
+        stop: threading.Event,
+    ):
+        """Decode every SAMPLE_RATE-th frame of each clip into frame_q.
+
+        Runs on the reader thread. Puts (clip_idx, frame_idx, rgb_frame,
+        thumbnail, motion) per sample, where thumbnail is a 32x32 grayscale
+        copy for change detection and motion the foreground fraction (0-1)
+        from a per-clip MOG2 background subtractor, (clip_idx, None, None,
+        None, None) at the end of each clip, and finally None (or the
+        exception that stopped decoding).
+        """
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    frame_q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
 
-                # Convert BGR to RGB for MediaPipe
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        try:
+            # Index of the next frame cap.read() will return
+            current_pos = 0
 
-                # Detect faces
-                result = detector.process(rgb_frame)
+            for clip_idx, (start_time, end_time) in enumerate(clip_times):
+                start_frame = int(start_time * fps)
+                end_frame = int(end_time * fps)
 
-                if result.detections:
-                    for detection in result.detections:
-                        bbox = detection.location_data.relative_bounding_box
+                # Background model over this clip's samples only
+                bg_sub = cv2.createBackgroundSubtractorMOG2(
+                    history=MOTION_HISTORY, varThreshold=16, detectShadows=False
+                )
 
-                        # Calculate face area as percentage of frame
-                        face_width = bbox.width
-                        face_height = bbox.height
-                        face_area_percent = face_width * face_height
+                frame_idx = start_frame
+                while frame_idx < end_frame:
+                    # Scan forward sequentially; only seek for backward or long jumps
+                    if not self._advance_capture(cap, current_pos, frame_idx):
+                        break
+                    ret, frame = cap.read()
+                    current_pos = frame_idx + 1
+
+                    if not ret:
+                        break
+
+                    # Downscaled RGB for MediaPipe
+                    rgb_frame = _to_detection_rgb(frame)
+                    thumb = cv2.cvtColor(
+                        cv2.resize(rgb_frame, (32, 32), interpolation=cv2.INTER_AREA),
+                        cv2.COLOR_RGB2GRAY,
+                    )
+                    mask = bg_sub.apply(
+                        cv2.resize(rgb_frame, MOTION_SIZE, interpolation=cv2.INTER_AREA)
+                    )
+                    # The clip's first sample has no background to compare against
+                    motion = 1.0 if frame_idx == start_frame else cv2.countNonZero(mask) / mask.size
+                    if not put((clip_idx, frame_idx, rgb_frame, thumb, motion)):
+                        return
+
+                    # Skip frames for performance
+                    frame_idx += SAMPLE_RATE
+
+                if not put((clip_idx, None, None, None, None)):
+                    return
+
+            put(None)
+        except Exception as e:
+            put(e)
 
-                        # Filter out small faces (background)
-                        if face_area_percent >= MIN_FACE_AREA_PERCENT:
-                            positions.append(FacePosition(
-                                x=bbox.xmin + face_width / 2,
-                                y=bbox.ymin + face_height / 2,
-                                width=face_width,
-                                height=face_height,
-                                timestamp=frame_idx / fps,
-                                confidence=detection.score[0] if detection.score else 0,
-                            ))
+    def _detect_batch(
+        self,
+        rgb_frames: List[np.ndarray],
+    ) -> List[List[Tuple[float, float, float, float, float]]]:
+        """Run face detection on a batch of RGB frames in parallel.
 
-                # Skip frames for performance
-                frame_idx += SAMPLE_RATE
+        Returns:
+            Per frame, the size-filtered faces as (x, y, width, height,
+            confidence) with x/y the face center (all 0-1)
+        """
+        results = _detect_executor.map(
+            lambda rgb: self._get_detector().process(rgb),
+            rgb_frames,
+        )
+
+        faces_per_frame = []
+        for result in results:
+            if not result.detections:
+                faces_per_frame.append([])
+                continue
 
-            # Summarize results for this clip
-            results[clip_idx] = self._summarize_detections(positions)
+            # (xmin, ymin, width, height, confidence) per detection
+            boxes = np.array(
+                [
+                    (
+                        bbox.xmin,
+                        bbox.ymin,
+                        bbox.width,
+                        bbox.height,
+                        detection.score[0] if detection.score else 0,
+                    )
+                    for detection in result.detections
+                    for bbox in (detection.location_data.relative_bounding_box,)
+                ],
+                dtype=np.float64,
+            )
 
-        cap.release()
-        return results
+            # Filter out small faces (background) by area as fraction of frame
+            boxes = boxes[boxes[:, 2] * boxes[:, 3] >= MIN_FACE_AREA_PERCENT]
+
+            # Top-left corner -> center
+            boxes[:, :2] += boxes[:, 2:4] / 2
+            faces_per_frame.append([tuple(row) for row in boxes.tolist()])
+
+        return faces_per_frame
+
+    def _flush_detections(
+        self,
+        batch: List[Tuple[int, np.ndarray]],
+        pending: List[Tuple[int, int]],
+        detections: Dict[int, List[Tuple[float, ...]]],
+        last_ref: Optional[int],
+        fps: float,
+    ) -> List[FacePosition]:
+        """Detect the batched frames, then emit positions for every pending sample.
+
+        Args:
+            batch: (frame_idx, rgb_frame) pairs still to be analyzed
+            pending: (frame_idx, ref_idx) per sample, in frame order; ref_idx
+                is the analyzed frame whose detections the sample uses
+            detections: Analyzed frame_idx -> faces; updated in place, keeping
+                only last_ref afterwards (the only frame later samples can reuse)
+            last_ref: Most recently analyzed frame_idx
+            fps: Video frame rate, for timestamps
+
+        Returns:
+            Face positions for the pending samples
+        """
+        if batch:
+            analyzed = self._detect_batch([rgb for _, rgb in batch])
+            detections.update(zip((idx for idx, _ in batch), analyzed))
+
+        positions = [
+            FacePosition(
+                x=x,
+                y=y,
+                width=width,
+                height=height,
+                timestamp=frame_idx / fps,
+                confidence=confidence,
+            )
+            for frame_idx, ref_idx in pending
+            for x, y, width, height, confidence in detections[ref_idx]
+        ]
+
+        batch.clear()
+        pending.clear()
+        last = detections.get(last_ref)
+        detections.clear()
+        if last is not None:
+            detections[last_ref] = last
+        return positions
+
+    def _advance_capture(
+        self,
+        cap: "cv2.VideoCapture",
+        current_pos: int,
+        target_frame: int,
+    ) -> bool:
+        """Position cap so the next read() returns target_frame.
+
+        Skipped frames are grab()bed (decoded, never color-converted or
+        copied out) rather than seeked past, since each CAP_PROP_POS_FRAMES
+        seek re-decodes from the previous keyframe.
+
+        Returns:
+            False if the stream ended before target_frame
+        """
+        gap = target_frame - current_pos
+        if gap == 0:
+            return True
+        if gap < 0 or gap > MAX_GRAB_SKIP_FRAMES:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
+            return True
+        for _ in range(gap):
+            if not cap.grab():
+                return False
+        return True
 
     def _summarize_detections(
         self,
@@ -267,7 +727,7 @@ class FaceDetector:
                 "face_count": 0,
             }
 
-        # Convert to dictionaries
+        # Convert the stored sample to dictionaries (limit stored positions)
         position_dicts = [
             {
                 "x": p.x,
@@ -276,18 +736,19 @@ class FaceDetector:
                 "height": p.height,
                 "timestamp": p.timestamp,
             }
-            for p in positions
+            for p in positions[:10]
         ]
 
-        # Calculate dominant (average) face position
-        avg_x = sum(p.x for p in positions) / len(positions)
-        avg_y = sum(p.y for p in positions) / len(positions)
-        avg_width = sum(p.width for p in positions) / len(positions)
-        avg_height = sum(p.height for p in positions) / len(positions)
+        # Calculate dominant (average) face position in one reduction
+        avg_x, avg_y, avg_width, avg_height = np.fromiter(
+            ((p.x, p.y, p.width, p.height) for p in positions),
+            dtype=np.dtype((np.float64, 4)),
+            count=len(positions),
+        ).mean(axis=0).tolist()
 
         return {
             "has_faces": True,
-            "positions": position_dicts[:10],  # Limit stored positions
+            "positions": position_dicts,
             "dominant_position": {
                 "x": avg_x,
                 "y": avg_y,
@@ -300,6 +761,7 @@ class FaceDetector:
     def detect_upper_body(
         self,
         frame: np.ndarray,
+        rgb_frame: Optional[np.ndarray] = None,
     ) -> List[Dict[str, Any]]:
         """
         Detect upper body/person when face is not visible.
@@ -309,18 +771,37 @@ class FaceDetector:
         - People with face masks
         - People facing away from camera
         - Backlit/silhouette shots
+
+        Args:
+            frame: BGR frame
+            rgb_frame: The frame's _to_detection_rgb() copy, if the caller
+                already made one; reused instead of converting frame again
         """
         try:
-            h, w = frame.shape[:2]
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            gray = cv2.equalizeHist(gray)
-
             bodies = []
 
             # Try upper body cascade if available
-            if self._upper_body_cascade is not None:
-                upper_bodies = self._upper_body_cascade.detectMultiScale(
-                    gray, scaleFactor=1.1, minNeighbors=3, minSize=(100, 100)
+            upper_body_cascade = _get_upper_body_cascade()
+            if upper_body_cascade is not None:
+                # Scan a downscaled copy; cascade cost grows with pixel count.
+                # Start from the (already small) detection copy when given
+                source = frame if rgb_frame is None else rgb_frame
+                scale = min(1.0, UPPER_BODY_MAX_DIM / max(source.shape[:2]))
+                small = source
+                if scale < 1:
+                    small = cv2.resize(source, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                h, w = small.shape[:2]
+                # Overall downscale relative to the original frame
+                scale = w / frame.shape[1]
+
+                gray = cv2.cvtColor(
+                    small, cv2.COLOR_BGR2GRAY if rgb_frame is None else cv2.COLOR_RGB2GRAY
+                )
+                gray = cv2.equalizeHist(gray)
+
+                min_size = max(1, int(100 * scale))
+                upper_bodies = upper_body_cascade.detectMultiScale(
+                    gray, scaleFactor=1.1, minNeighbors=3, minSize=(min_size, min_size)
                 )
                 for (x, y, bw, bh) in upper_bodies:
                     # Estimate head position (top 30% of upper body)
@@ -340,7 +821,7 @@ class FaceDetector:
 
             # Try MediaPipe Pose if available and no bodies found
             if not bodies:
-                pose_bodies = self._detect_person_pose(frame)
+                pose_bodies = self._detect_person_pose(frame, rgb_frame)
                 bodies.extend(pose_bodies)
 
             return bodies
@@ -351,6 +832,7 @@ class FaceDetector:
     def _detect_person_pose(
         self,
         frame: np.ndarray,
+        rgb_frame: Optional[np.ndarray] = None,
     ) -> List[Dict[str, Any]]:
         """
         Use MediaPipe Pose to detect person and estimate head position.
@@ -363,7 +845,8 @@ class FaceDetector:
             if pose_detector is None:
                 return []
 
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if rgb_frame is None:
+                rgb_frame = _to_detection_rgb(frame)
             results = pose_detector.process(rgb_frame)
 
             persons = []
@@ -414,13 +897,11 @@ class FaceDetector:
         try:
             # Resize for faster processing
             small = cv2.resize(frame, (100, 100))
-            pixels = small.reshape(-1, 3)
 
-            # Find dominant color
-            pixel_counts = Counter(map(tuple, pixels))
-            dominant_bgr = pixel_counts.most_common(1)[0][0]
-
-            r, g, b = dominant_bgr[2], dominant_bgr[1], dominant_bgr[0]
+            # Find dominant color: 16 bins per channel (4 bits) so near-equal
+            # pixels vote together; report the winning bin's center
+            hist = cv2.calcHist([small], [0, 1, 2], None, [16, 16, 16], [0, 256] * 3)
+            b, g, r = (int(i) * 16 + 8 for i in np.unravel_index(hist.argmax(), hist.shape))
             brightness = (r + g + b) / 3
 
             # Determine theme and suggested caption color
@@ -475,21 +956,34 @@ class FaceDetector:
             start_time + duration * 0.8,
         ]
 
-        for t in sample_times:
-            if t >= end_time:
-                continue
+        # Decode all samples in one pass over the clip, then detect them
+        # concurrently (MediaPipe releases the GIL); results stay in sample order
+        frames = self.extract_frames(
+            video_path, [t for t in sample_times if t < end_time]
+        )
+        def detect_sample(frame: np.ndarray):
+            # One detection-size RGB copy per sample, shared with the fallbacks
+            rgb_frame = _to_detection_rgb(frame)
+            # Detect faces with size filtering
+            return rgb_frame, self._detect_faces_in_frame(frame, rgb_frame)
+
+        sampled = [
+            (frame, *detected)
+            for frame, detected in zip(frames, _detect_executor.map(
+                lambda frame: detect_sample(frame) if frame is not None else (None, []),
+                frames,
+            ))
+        ]
 
-            frame = self.extract_frame(video_path, t)
+        for frame, rgb_frame, faces in sampled:
             if frame is None:
                 continue
 
-            # Detect faces with size filtering
-            faces = self._detect_faces_in_frame(frame)
             all_faces.extend(faces)
 
             # If no faces found, try upper body detection
             if not faces:
-                body_detections = self.detect_upper_body(frame)
+                body_detections = self.detect_upper_body(frame, rgb_frame)
                 all_faces.extend(body_detections)
 
         # Cluster faces to find dominant positions
@@ -508,9 +1002,12 @@ class FaceDetector:
             reverse=True,
         )
 
-        # Get theme from first frame
+        # Get theme from first frame (the first sample, when it was taken)
         theme = {"theme": "neutral", "highlight_color": "00FFFF"}
-        first_frame = self.extract_frame(video_path, start_time + 0.5)
+        if sample_times[0] < end_time:
+            first_frame = sampled[0][0]
+        else:
+            first_frame = self.extract_frame(video_path, start_time + 0.5)
         if first_frame is not None:
             theme = self.detect_dominant_color(first_frame)
 
@@ -534,8 +1031,12 @@ class FaceDetector:
     def _detect_faces_in_frame(
         self,
         frame: np.ndarray,
+        rgb_frame: Optional[np.ndarray] = None,
     ) -> List[Dict[str, Any]]:
-        """Detect faces in a single frame with size filtering."""
+        """Detect faces in a single frame with size filtering.
+
+        rgb_frame is the frame's _to_detection_rgb() copy, if already made.
+        """
         h, w = frame.shape[:2]
         frame_area = h * w
         min_face_area = frame_area * MIN_FACE_AREA_PERCENT
@@ -543,7 +1044,8 @@ class FaceDetector:
         detector = self._get_detector()
 
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if rgb_frame is None:
+                rgb_frame = _to_detection_rgb(frame)
             results = detector.process(rgb_frame)
 
             faces = []
@@ -582,27 +1084,36 @@ class FaceDetector:
             return []
 
         threshold = FACE_CLUSTER_THRESHOLD / frame_w  # Normalize to 0-1
-        clusters = []
-        used = set()
-
-        for i, face in enumerate(faces):
-            if i in used:
-                continue
-
-            cluster = [face]
-            used.add(i)
 
-            for j, other in enumerate(faces):
-                if j in used:
+        if len(faces) < CLUSTER_KERNEL_MIN_FACES:
+            # Each unclaimed face seeds a cluster of the later unclaimed
+            # faces close to it (same person)
+            clusters: List[List[Dict[str, Any]]] = []
+            used = [False] * len(faces)
+            for i, face in enumerate(faces):
+                if used[i]:
                     continue
-
-                # Check if faces are close (same person)
-                dist = abs(face["x"] - other["x"]) + abs(face["y"] - other["y"])
-                if dist < threshold:
-                    cluster.append(other)
-                    used.add(j)
-
-            clusters.append(cluster)
+                used[i] = True
+                cluster = [face]
+                for j in range(i + 1, len(faces)):
+                    if used[j]:
+                        continue
+                    other = faces[j]
+                    if abs(face["x"] - other["x"]) + abs(face["y"] - other["y"]) < threshold:
+                        cluster.append(other)
+                        used[j] = True
+                clusters.append(cluster)
+            return clusters
+
+        from .face_kernels import cluster_labels
+
+        pts = np.array([(f["x"], f["y"]) for f in faces], dtype=np.float64)
+        labels = cluster_labels(pts, threshold)
+
+        # Labels are numbered in seed order; members keep detection order
+        clusters = [[] for _ in range(int(labels.max()) + 1)]
+        for face, label in zip(faces, labels.tolist()):
+            clusters[label].append(face)
 
         return clusters
 
@@ -614,10 +1125,10 @@ class FaceDetector:
         if not faces:
             return None
 
-        avg_x = sum(f["x"] for f in faces) / len(faces)
-        avg_y = sum(f["y"] for f in faces) / len(faces)
-        avg_w = sum(f["width"] for f in faces) / len(faces)
-        avg_h = sum(f["height"] for f in faces) / len(faces)
+        avg_x, avg_y, avg_w, avg_h = np.array(
+            [(f["x"], f["y"], f["width"], f["height"]) for f in faces],
+            dtype=np.float64,
+        ).mean(axis=0).tolist()
 
         return {
             "x": avg_x,
@@ -646,7 +1157,15 @@ class FaceDetector:
         self,
         video_path: str,
     ) -> Dict[str, Any]:
-        """Get video dimensions using ffprobe."""
+        """Get video dimensions using ffprobe (cached per file version)."""
+        try:
+            st = os.stat(video_path)
+            key = (video_path, st.st_mtime_ns, st.st_size)
+        except OSError:
+            key = None
+        if key is not None and key in self._video_info_cache:
+            return dict(self._video_info_cache[key])
+
         try:
             cmd = [
                 'ffprobe', '-v', 'error',
@@ -660,11 +1179,14 @@ class FaceDetector:
             if result.returncode == 0:
                 parts = result.stdout.strip().split(',')
                 if len(parts) >= 2:
-                    return {
+                    info = {
                         "width": int(parts[0]),
                         "height": int(parts[1]),
                         "duration": float(parts[2]) if len(parts) > 2 and parts[2] else 0,
                     }
+                    if key is not None:
+                        self._video_info_cache[key] = info
+                    return dict(info)
         except Exception as e:
             print(f"ffprobe failed: {e}")
 
@@ -758,6 +1280,16 @@ class LayoutCalculator:
         },
     }
 
+    # Shared detector for crop-region math (built on first use)
+    _detector_instance: Optional[FaceDetector] = None
+
+    @classmethod
+    def _get_detector(cls) -> FaceDetector:
+        """Get the shared FaceDetector instance."""
+        if cls._detector_instance is None:
+            cls._detector_instance = FaceDetector()
+        return cls._detector_instance
+
     @staticmethod
     def get_layout_config(
         layout: str,
@@ -780,7 +1312,7 @@ class LayoutCalculator:
         frame_height: int,
     ) -> Dict[str, Any]:
         """Standard vertical crop layout with smart face centering."""
-        detector = FaceDetector()
+        detector = LayoutCalculator._get_detector()
         crop = detector.get_crop_region(
             face_data,
             target_aspect=9 / 16,
@@ -926,27 +1458,22 @@ class LayoutCalculator:
             f2_h = face_region_2.get("height", 0.3)
 
             # Expand crops to 9:16 aspect with face centered
-            def expand_to_vertical(fx, fy, fw, fh):
-                # Target aspect for each half: 1080 x 960 = 9:8
-                target_ratio = 9 / 8
-                expand_w = min(fh * target_ratio, 1.0)
-                expand_h = min(expand_w / target_ratio, 1.0)
-                cx = max(expand_w / 2, min(fx, 1 - expand_w / 2))
-                cy = max(expand_h / 2, min(fy, 1 - expand_h / 2))
-                return {
-                    "x": int((cx - expand_w / 2) * frame_width),
-                    "y": int((cy - expand_h / 2) * frame_height),
-                    "width": int(expand_w * frame_width),
-                    "height": int(expand_h * frame_height),
-                }
+            top_crop, bottom_crop = (
+                dict(zip(("x", "y", "width", "height"), crop))
+                for crop in LayoutCalculator._expand_to_vertical(
+                    np.array([[f1_x, f1_y, f1_w, f1_h], [f2_x, f2_y, f2_w, f2_h]], dtype=np.float64),
+                    frame_width,
+                    frame_height,
+                ).tolist()
+            )
 
             return {
                 "type": "podcast_split",
                 "output_width": output_w,
                 "output_height": output_h,
                 "split": "vertical",
-                "top_crop": expand_to_vertical(f1_x, f1_y, f1_w, f1_h),
-                "bottom_crop": expand_to_vertical(f2_x, f2_y, f2_w, f2_h),
+                "top_crop": top_crop,
+                "bottom_crop": bottom_crop,
                 "num_speakers": 2,
             }
         else:
@@ -975,7 +1502,7 @@ class LayoutCalculator:
                 }
             else:
                 # Fallback to center crop
-                detector = FaceDetector()
+                detector = LayoutCalculator._get_detector()
                 speaker_crop = detector.get_crop_region(
                     {},
                     target_aspect=9 / 16,
@@ -991,6 +1518,35 @@ class LayoutCalculator:
                 "num_speakers": 1,
             }
 
+    @staticmethod
+    def _expand_to_vertical(
+        faces: np.ndarray,
+        frame_width: int,
+        frame_height: int,
+    ) -> np.ndarray:
+        """
+        Expand face boxes to split-panel crops centered on each face.
+
+        Args:
+            faces: (N, 4) array of (x, y, width, height), x/y the face center (0-1)
+            frame_width: Source frame width
+            frame_height: Source frame height
+
+        Returns:
+            (N, 4) int array of pixel crops as (x, y, width, height)
+        """
+        # Target aspect for each half: 1080 x 960 = 9:8
+        target_ratio = 9 / 8
+        expand_w = np.minimum(faces[:, 3] * target_ratio, 1.0)
+        expand_h = np.minimum(expand_w / target_ratio, 1.0)
+        cx = np.clip(faces[:, 0], expand_w / 2, 1 - expand_w / 2)
+        cy = np.clip(faces[:, 1], expand_h / 2, 1 - expand_h / 2)
+
+        crops = np.stack(
+            [cx - expand_w / 2, cy - expand_h / 2, expand_w, expand_h], axis=1
+        ) * np.array([frame_width, frame_height, frame_width, frame_height])
+        return crops.astype(np.int64)
+
     @staticmethod
     def _legacy_podcast_layout(
         face_data: Dict[str, Any],
@@ -0,0 +1,44 @@
+"""
+Numba kernels for face detection post-processing.
+
+These let FaceDetector._cluster_faces group large detection sets without
+a Python loop over face pairs or an (N, N) distance matrix. Serial for the
+same reason as beat_kernels: callers are worker threads.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def cluster_labels(pts: np.ndarray, threshold: float) -> np.ndarray:
+    """Greedy seed clustering of face centers by L1 distance.
+
+    Faces are visited in order; each one not yet claimed seeds a new
+    cluster and claims every later unclaimed face whose L1 distance to
+    the seed is below threshold. Membership is not transitive: a face
+    near a cluster member but not near its seed starts its own cluster.
+
+    Args:
+        pts: (N, 2) array of face centers (x, y), 0-1
+        threshold: Maximum L1 distance (exclusive) to the seed, 0-1
+
+    Returns:
+        int32 array of N cluster labels, numbered in seed order from 0
+    """
+    n = pts.shape[0]
+    labels = np.full(n, -1, dtype=np.int32)
+    n_clusters = 0
+
+    for i in range(n):
+        if labels[i] >= 0:
+            continue
+        labels[i] = n_clusters
+        xi = pts[i, 0]
+        yi = pts[i, 1]
+        for j in range(i + 1, n):
+            if labels[j] < 0 and abs(xi - pts[j, 0]) + abs(yi - pts[j, 1]) < threshold:
+                labels[j] = n_clusters
+        n_clusters += 1
+
+    return labels
@@ -8,15 +8,133 @@ Professional flash frame effects for trailer editing including:
 - Configurable patterns for rhythm
 """
 
+import collections
+import contextlib
+import functools
+import itertools
 import logging
-import subprocess
 import os
+import subprocess
+import tempfile
+import threading
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Optional
 
+import numpy as np
+
+from .cpu_utils import container_cpus, get_process_pool
+
 logger = logging.getLogger(__name__)
 
+# Flash plans at least this long are deduplicated with the Numba kernel
+DEDUPE_KERNEL_MIN_FLASHES = 64
+
+# create_flash_plan spreads scene planning over a process pool from this many
+# scenes; below it, pool startup and pickling cost more than the loop
+PARALLEL_PLAN_MIN_SCENES = 2000
+
+# Filter chains for plans with at least this many flashes are handed to
+# ffmpeg as a script file instead of inline, keeping argv bounded
+FILTER_SCRIPT_MIN_FLASHES = 32
+
+
+@contextlib.contextmanager
+def _filter_complex_args(filter_chain: str, flash_count: int):
+    """Yield the ffmpeg args for a filter chain: inline, or via a temp script file."""
+    if flash_count < FILTER_SCRIPT_MIN_FLASHES:
+        yield ["-filter_complex", filter_chain]
+        return
+
+    with tempfile.NamedTemporaryFile("w", suffix=".ffscript", delete=False) as script:
+        script.write(filter_chain)
+    try:
+        yield ["-filter_complex_script", script.name]
+    finally:
+        os.unlink(script.name)
+
+
+def _run_ffmpeg(cmd: list[str], timeout: float, tail_lines: int = 200) -> tuple[int, str]:
+    """
+    Run an FFmpeg command, keeping only the tail of its stderr.
+
+    stderr is read line by line as it is produced (progress updates are
+    \r-separated, which text mode splits into lines) so memory stays bounded
+    however long the encode runs.
+
+    Returns:
+        (return code, last tail_lines lines of stderr)
+
+    Raises:
+        subprocess.TimeoutExpired: If the process ran longer than timeout
+    """
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    try:
+        tail = collections.deque(process.stderr, maxlen=tail_lines)
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        process.stderr.close()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return returncode, "".join(tail)
+
+
+@functools.lru_cache(maxsize=512)
+def _probe_dimensions(video_path: str, mtime_ns: int, size: int) -> tuple[int, int]:
+    """
+    Read a video's width and height, cached by (path, mtime, size).
+
+    Reads the stream header in-process with PyAV; falls back to ffprobe.
+    Raises ValueError when neither can tell, so failures are not cached.
+    """
+    try:
+        import av
+
+        with av.open(video_path) as container:
+            codec = container.streams.video[0].codec_context
+            if codec.width and codec.height:
+                return codec.width, codec.height
+    except Exception as e:
+        logger.debug(f"PyAV probe failed, using ffprobe: {e}")
+
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "stream=width,height",
+        "-of", "csv=p=0:s=x",
+        video_path
+    ]
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        timeout=30
+    )
+
+    if result.returncode == 0:
+        parts = result.stdout.strip().split("x")
+        if len(parts) == 2:
+            return int(parts[0]), int(parts[1])
+    raise ValueError(f"Could not probe dimensions of {video_path}")
+
 
 class FlashColor(Enum):
     """Available flash colors for trailer effects."""
@@ -27,9 +145,9 @@ class FlashColor(Enum):
     ORANGE = "orange"
 
 
-@dataclass
+@dataclass(frozen=True)
 class FlashConfig:
-    """Configuration for a single flash frame."""
+    """Configuration for a single flash frame (immutable, so plans can key caches)."""
     timestamp: float  # Time in seconds
     duration: float  # Flash duration in seconds
     color: FlashColor = FlashColor.WHITE
@@ -38,6 +156,56 @@ class FlashConfig:
     fade_out: float = 0.0  # Fade out duration
 
 
+# Flash plans are built as one structured array (a row per flash) and only
+# turned into FlashConfig objects for the flashes that survive deduping.
+# Colors are stored as their index in _FLASH_COLORS.
+_FLASH_COLORS = tuple(FlashColor)
+_FLASH_COLOR_CODES = {color: code for code, color in enumerate(_FLASH_COLORS)}
+_FLASH_DTYPE = np.dtype([
+    ("timestamp", "f8"),
+    ("duration", "f8"),
+    ("color", "u1"),
+    ("intensity", "f8"),
+    ("fade_in", "f8"),
+    ("fade_out", "f8"),
+])
+
+
+def _flash_row(
+    timestamp: float,
+    duration: float,
+    color: FlashColor,
+    intensity: float = 1.0,
+    fade_in: float = 0.0,
+    fade_out: float = 0.0
+) -> tuple:
+    """One _FLASH_DTYPE row, with FlashConfig's argument order and defaults."""
+    return (timestamp, duration, _FLASH_COLOR_CODES[color], intensity, fade_in, fade_out)
+
+
+def _flash_configs(plan: np.ndarray) -> list[FlashConfig]:
+    """Convert a _FLASH_DTYPE array to FlashConfig objects."""
+    return [
+        FlashConfig(
+            timestamp=timestamp,
+            duration=duration,
+            color=_FLASH_COLORS[color],
+            intensity=intensity,
+            fade_in=fade_in,
+            fade_out=fade_out
+        )
+        for timestamp, duration, color, intensity, fade_in, fade_out in plan.tolist()
+    ]
+
+
+@functools.lru_cache(maxsize=256)
+def _color_token(color: FlashColor, intensity: float) -> str:
+    """FFmpeg color@opacity string for a flash (memoized per color/intensity)."""
+    color_values = FlashFrameRenderer.COLOR_VALUES
+    template = color_values.get(color, color_values[FlashColor.WHITE])
+    return template.format(intensity=round(intensity, 3))
+
+
 @dataclass
 class FlashPattern:
     """A pattern of flash frames for rhythmic effects."""
@@ -63,6 +231,15 @@ class FlashFrameRenderer:
         FlashColor.ORANGE: "0xFF6600@{intensity}",
     }
 
+    # Color values without opacity
+    COLOR_HEX = {
+        FlashColor.WHITE: "white",
+        FlashColor.BLACK: "black",
+        FlashColor.RED: "0xFF0000",
+        FlashColor.BLUE: "0x0066FF",
+        FlashColor.ORANGE: "0xFF6600",
+    }
+
     # Preset patterns for common trailer effects
     PRESET_PATTERNS = {
         "tension_build": [
@@ -114,7 +291,10 @@ class FlashFrameRenderer:
         Returns:
             True if successful, False otherwise
         """
-        if not os.path.exists(input_path):
+        # One stat serves as the existence check and the dimensions cache key
+        try:
+            st = os.stat(input_path)
+        except OSError:
             logger.error(f"Input file not found: {input_path}")
             return False
 
@@ -123,7 +303,7 @@ class FlashFrameRenderer:
             return self._copy_file(input_path, output_path)
 
         # Get video dimensions
-        width, height = self._get_video_dimensions(input_path)
+        width, height = self._get_video_dimensions(input_path, st)
         if width is None or height is None:
             logger.error("Could not determine video dimensions")
             return False
@@ -131,30 +311,25 @@ class FlashFrameRenderer:
         # Build filter chain for all flashes
         filter_chain = self._build_flash_filter_chain(flashes, width, height)
 
-        cmd = [
-            self.ffmpeg_path,
-            "-i", input_path,
-            "-filter_complex", filter_chain,
-            "-map", "[v]",
-            "-map", "0:a?",
-            "-c:v", "libx264",
-            "-preset", "medium",
-            "-crf", "18",
-            "-c:a", "copy",
-            "-y",
-            output_path
-        ]
-
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
-
-            if result.returncode != 0:
-                logger.error(f"Flash frames failed: {result.stderr}")
+            with _filter_complex_args(filter_chain, len(flashes)) as filter_args:
+                cmd = [
+                    self.ffmpeg_path,
+                    "-i", input_path,
+                    *filter_args,
+                    "-map", "[v]",
+                    "-map", "0:a?",
+                    "-c:v", "libx264",
+                    "-preset", "medium",
+                    "-crf", "18",
+                    "-c:a", "copy",
+                    "-y",
+                    output_path
+                ]
+                returncode, stderr_tail = _run_ffmpeg(cmd, timeout=300)
+
+            if returncode != 0:
+                logger.error(f"Flash frames failed: {stderr_tail}")
                 return False
 
             logger.info(f"Added {len(flashes)} flash frames to {output_path}")
@@ -173,101 +348,110 @@ class FlashFrameRenderer:
         width: int,
         height: int
     ) -> str:
-        """Build the FFmpeg filter chain for flash effects."""
-        # Start with input
-        filter_parts = ["[0:v]"]
-        current_output = "v0"
+        """Build the FFmpeg filter chain for flash effects (memoized per plan and size)."""
+        return self._build_flash_filter_chain_cached(tuple(flashes), width, height)
 
-        for i, flash in enumerate(flashes):
-            input_label = f"v{i}" if i > 0 else "0:v"
-            output_label = f"v{i + 1}"
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _build_flash_filter_chain_cached(
+        flashes: tuple[FlashConfig, ...],
+        width: int,
+        height: int
+    ) -> str:
+        """
+        Build the FFmpeg filter chain for flash effects.
 
-            # Get color value
-            color_template = self.COLOR_VALUES.get(
-                flash.color,
-                self.COLOR_VALUES[FlashColor.WHITE]
-            )
-            color = color_template.format(intensity=flash.intensity)
+        Instant flashes are bucketed by (color, intensity) into one drawbox
+        per bucket whose enable expression ORs (sums) all of the bucket's
+        intervals, so the graph has one node per distinct look rather than
+        one per flash. Fading flashes keep their own node.
+        """
+        # (color, intensity) -> enable intervals, in first-seen order
+        buckets: dict[tuple[FlashColor, float], list[str]] = {}
+        fade_flashes = []
 
-            # Build the drawbox filter with enable condition
-            # This draws a full-screen colored box during the flash
-            enable_expr = (
+        for flash in flashes:
+            if flash.fade_in > 0 or flash.fade_out > 0:
+                fade_flashes.append(flash)
+                continue
+            buckets.setdefault((flash.color, flash.intensity), []).append(
                 f"between(t,{flash.timestamp},{flash.timestamp + flash.duration})"
             )
 
-            # If there's fade in/out, we need a more complex approach
-            if flash.fade_in > 0 or flash.fade_out > 0:
-                # Use blend/overlay approach for fading
-                flash_filter = self._build_fade_flash_filter(
-                    flash, width, height, input_label, output_label
-                )
-            else:
-                # Simple drawbox for instant flash
-                flash_filter = (
-                    f"[{input_label}]drawbox=x=0:y=0:w={width}:h={height}:"
-                    f"c={color}:t=fill:enable='{enable_expr}'[{output_label}]"
-                )
+        filter_parts = []
+        input_label = "0:v"
+        node_count = len(buckets) + len(fade_flashes)
 
-            filter_parts.append(flash_filter)
-            current_output = output_label
+        def next_label() -> str:
+            # The last node writes the final [v] output directly
+            index = len(filter_parts) + 1
+            return "v" if index == node_count else f"v{index}"
 
-        # Build final chain
-        full_chain = ";".join(filter_parts[1:])  # Skip initial marker
-        full_chain = full_chain.replace(f"[{current_output}]", "[v]")
+        for (flash_color, intensity), intervals in buckets.items():
+            # Get color value
+            color = _color_token(flash_color, intensity)
+
+            # Full-screen colored box while any of the bucket's flashes is on
+            output_label = next_label()
+            filter_parts.append(
+                f"[{input_label}]drawbox=x=0:y=0:w={width}:h={height}:"
+                f"c={color}:t=fill:enable='{'+'.join(intervals)}'[{output_label}]"
+            )
+            input_label = output_label
+
+        for flash in fade_flashes:
+            # Use blend/overlay approach for fading
+            output_label = next_label()
+            filter_parts.append(FlashFrameRenderer._build_fade_flash_filter(
+                flash, width, height, input_label, output_label
+            ))
+            input_label = output_label
 
-        return full_chain
+        # Build final chain
+        return ";".join(filter_parts)
 
+    @staticmethod
     def _build_fade_flash_filter(
-        self,
         flash: FlashConfig,
         width: int,
         height: int,
         input_label: str,
         output_label: str
     ) -> str:
-        """Build a flash filter with fade in/out."""
-        color_template = self.COLOR_VALUES.get(
-            flash.color,
-            self.COLOR_VALUES[FlashColor.WHITE]
-        )
+        """
+        Build a flash filter with fade in/out.
 
-        # For fading flashes, we use a more complex expression
-        # that modulates the opacity over time
+        A solid color source the size of the frame is faded in/out on its
+        alpha channel with the native fade filter, shifted to the flash
+        time, and overlaid on the video only while the flash is on.
+        """
         start = flash.timestamp
-        fade_in_end = start + flash.fade_in
-        fade_out_start = start + flash.duration - flash.fade_out
         end = start + flash.duration
-
-        # Build opacity expression
-        opacity_expr = (
-            f"if(between(t,{start},{fade_in_end}),"
-            f"{flash.intensity}*(t-{start})/{flash.fade_in},"  # Fade in
-            f"if(between(t,{fade_in_end},{fade_out_start}),"
-            f"{flash.intensity},"  # Full intensity
-            f"if(between(t,{fade_out_start},{end}),"
-            f"{flash.intensity}*(1-(t-{fade_out_start})/{flash.fade_out}),"  # Fade out
-            f"0)))"  # Outside flash
-        )
-
-        # Use geq filter for per-frame opacity
-        color_hex = self._get_color_hex(flash.color)
+        duration = max(flash.duration, 0.001)
+        source_label = f"{output_label}f"
+
+        # Full-opacity color is capped at the flash intensity; fades scale alpha
+        source = [
+            f"color=c={_color_token(flash.color, flash.intensity)}:"
+            f"s={width}x{height}:d={duration}:r=60",
+            "format=yuva444p",
+        ]
+        if flash.fade_in > 0:
+            source.append(f"fade=t=in:st=0:d={flash.fade_in}:alpha=1")
+        if flash.fade_out > 0:
+            fade_out_start = max(duration - flash.fade_out, 0)
+            source.append(f"fade=t=out:st={fade_out_start}:d={flash.fade_out}:alpha=1")
+        source.append(f"setpts=PTS+{start}/TB")
 
         return (
-            f"[{input_label}]drawbox=x=0:y=0:w={width}:h={height}:"
-            f"c={color_hex}@'{opacity_expr}':t=fill:enable='between(t,{start},{end})'"
-            f"[{output_label}]"
+            f"{','.join(source)}[{source_label}];"
+            f"[{input_label}][{source_label}]overlay=eof_action=pass:"
+            f"enable='between(t,{start},{end})'[{output_label}]"
         )
 
     def _get_color_hex(self, color: FlashColor) -> str:
         """Get the hex color code without opacity."""
-        color_map = {
-            FlashColor.WHITE: "white",
-            FlashColor.BLACK: "black",
-            FlashColor.RED: "0xFF0000",
-            FlashColor.BLUE: "0x0066FF",
-            FlashColor.ORANGE: "0xFF6600",
-        }
-        return color_map.get(color, "white")
+        return self.COLOR_HEX.get(color, "white")
 
     def add_pattern_at_timestamp(
         self,
@@ -294,19 +478,15 @@ class FlashFrameRenderer:
             logger.warning(f"Unknown pattern: {pattern_name}, using 'impact'")
             pattern_name = "impact"
 
-        pattern_data = self.PRESET_PATTERNS[pattern_name]
-        flashes = []
-
-        for flash_def in pattern_data:
-            color_str = flash_def.get("color", "white")
-            color = FlashColor(color_str)
-
-            flashes.append(FlashConfig(
-                timestamp=timestamp + flash_def["offset"],
-                duration=flash_def["duration"],
+        flashes = [
+            FlashConfig(
+                timestamp=timestamp + offset,
+                duration=duration,
                 color=color,
                 intensity=intensity
-            ))
+            )
+            for offset, duration, color in _PRESET_TEMPLATES[pattern_name]
+        ]
 
         return self.add_flash_frames(input_path, output_path, flashes)
 
@@ -327,10 +507,59 @@ class FlashFrameRenderer:
         Returns:
             List of FlashConfig objects
         """
-        flashes = []
-        beat_set = set(beat_times) if beat_times else set()
+        # Unique, sorted beats so each scene's beats are one searchsorted slice
+        beats = np.unique(np.asarray(beat_times or [], dtype=np.float64))
+
+        if len(scenes) < PARALLEL_PLAN_MIN_SCENES:
+            plan = self._plan_scenes(scenes, beats)
+        else:
+            # Very large plans: chunk the scenes across the shared process
+            # pool; chunks come back in order, so the merge matches the
+            # sequential result
+            workers = container_cpus()
+            chunk_size = -(-len(scenes) // workers)
+            chunks = [scenes[i:i + chunk_size] for i in range(0, len(scenes), chunk_size)]
+            plan = np.concatenate(list(
+                get_process_pool().map(self._plan_scenes, chunks, itertools.repeat(beats))
+            ))
+
+        # Add final climax flash if we have trailer duration
+        if trailer_duration and trailer_duration > 5:
+            # Big flash near the end
+            plan = np.append(plan, np.array([_flash_row(
+                timestamp=trailer_duration - 2.0,
+                duration=0.1,
+                color=FlashColor.WHITE,
+                intensity=1.0,
+                fade_out=0.15
+            )], dtype=_FLASH_DTYPE))
+
+        # Sort by timestamp (stable, so ties keep their planning order)
+        plan = plan[np.argsort(plan["timestamp"], kind="stable")]
+
+        # Remove overlapping flashes
+        plan = self._remove_overlapping_flashes(plan)
+
+        return _flash_configs(plan)
+
+    def _plan_scenes(
+        self,
+        scenes: list[dict],
+        beats: np.ndarray
+    ) -> np.ndarray:
+        """
+        Plan the per-scene flashes for a run of scenes (unsorted).
+
+        Args:
+            scenes: List of scene dicts with importance and emotion
+            beats: Sorted, unique music beat timestamps
+
+        Returns:
+            _FLASH_DTYPE array of flashes, in scene order
+        """
+        rows = []
 
-        for i, scene in enumerate(scenes):
+        for scene in scenes:
             importance = scene.get("importance", 0)
             emotion = scene.get("emotion", "")
             scene_start = scene.get("start", 0)
@@ -343,19 +572,22 @@ class FlashFrameRenderer:
             # Determine flash type based on emotion
             if emotion in ["action", "intense"]:
                 # Action scenes get impact flashes on beats
-                for beat in beat_set:
-                    if scene_start <= beat <= scene_end:
-                        flashes.append(FlashConfig(
-                            timestamp=beat,
-                            duration=0.05,
-                            color=FlashColor.ORANGE,
-                            intensity=0.8
-                        ))
+                lo = np.searchsorted(beats, scene_start, side="left")
+                hi = np.searchsorted(beats, scene_end, side="right")
+                rows.extend(
+                    _flash_row(
+                        timestamp=beat,
+                        duration=0.05,
+                        color=FlashColor.ORANGE,
+                        intensity=0.8
+                    )
+                    for beat in beats[lo:hi].tolist()
+                )
 
             elif emotion in ["horror", "thriller"]:
                 # Horror scenes get red flashes
                 mid_point = (scene_start + scene_end) / 2
-                flashes.append(FlashConfig(
+                rows.append(_flash_row(
                     timestamp=mid_point,
                     duration=0.04,
                     color=FlashColor.RED,
@@ -364,7 +596,7 @@ class FlashFrameRenderer:
 
             elif emotion in ["dramatic", "reveal", "climax"]:
                 # Dramatic moments get white impact flashes
-                flashes.append(FlashConfig(
+                rows.append(_flash_row(
                     timestamp=scene_start,
                     duration=0.08,
                     color=FlashColor.WHITE,
@@ -382,26 +614,9 @@ class FlashFrameRenderer:
                     5,    # 5 flashes accelerating
                     FlashColor.WHITE
                 )
-                flashes.extend(pattern)
+                rows.extend(pattern.tolist())
 
-        # Add final climax flash if we have trailer duration
-        if trailer_duration and trailer_duration > 5:
-            # Big flash near the end
-            flashes.append(FlashConfig(
-                timestamp=trailer_duration - 2.0,
-                duration=0.1,
-                color=FlashColor.WHITE,
-                intensity=1.0,
-                fade_out=0.15
-            ))
-
-        # Sort by timestamp
-        flashes.sort(key=lambda f: f.timestamp)
-
-        # Remove overlapping flashes
-        flashes = self._remove_overlapping_flashes(flashes)
-
-        return flashes
+        return np.array(rows, dtype=_FLASH_DTYPE)
 
     def _generate_tension_build(
         self,
@@ -409,96 +624,80 @@ class FlashFrameRenderer:
         total_duration: float,
         flash_count: int,
         color: FlashColor
-    ) -> list[FlashConfig]:
-        """Generate accelerating flash pattern for tension building."""
-        flashes = []
-
-        # Calculate accelerating intervals
-        # Each interval is 70% of the previous one
-        intervals = []
-        interval = total_duration / flash_count
-        remaining = total_duration
-
-        for i in range(flash_count):
-            intervals.append(interval)
-            remaining -= interval
-            interval *= 0.7  # Accelerate
-
-        # Normalize to fit in duration
-        total_intervals = sum(intervals)
-        scale = total_duration / total_intervals
-
-        current_time = start_time
-        for i, interval in enumerate(intervals):
-            scaled_interval = interval * scale
-            # Flash duration gets shorter too
-            flash_duration = max(0.02, 0.05 * (1 - i / flash_count))
-
-            flashes.append(FlashConfig(
-                timestamp=current_time,
-                duration=flash_duration,
-                color=color,
-                intensity=0.6 + 0.4 * (i / flash_count)  # Intensity builds
-            ))
-
-            current_time += scaled_interval
-
-        return flashes
+    ) -> np.ndarray:
+        """Generate accelerating flash pattern for tension building (_FLASH_DTYPE rows)."""
+        # Each interval is 70% of the previous one, scaled so they fill
+        # total_duration: interval_k = total * (1 - r) / (1 - r^n) * r^k
+        ratio = 0.7
+        steps = np.arange(flash_count)
+        intervals = total_duration * (1 - ratio) / (1 - ratio ** flash_count) * ratio ** steps
+
+        # Each flash starts after all the previous intervals
+        timestamps = start_time + np.concatenate(([0.0], np.cumsum(intervals[:-1])))
+        # Flash duration gets shorter too
+        durations = np.maximum(0.02, 0.05 * (1 - steps / flash_count))
+        # Intensity builds
+        intensities = 0.6 + 0.4 * (steps / flash_count)
+
+        pattern = np.zeros(flash_count, dtype=_FLASH_DTYPE)
+        pattern["timestamp"] = timestamps
+        pattern["duration"] = durations
+        pattern["color"] = _FLASH_COLOR_CODES[color]
+        pattern["intensity"] = intensities
+        return pattern
 
     def _remove_overlapping_flashes(
         self,
-        flashes: list[FlashConfig],
+        plan: np.ndarray,
         min_gap: float = 0.03
-    ) -> list[FlashConfig]:
-        """Remove flashes that overlap or are too close together."""
-        if not flashes:
-            return []
+    ) -> np.ndarray:
+        """Remove flashes that overlap or are too close together (plan sorted by timestamp)."""
+        if len(plan) == 0:
+            return plan
+
+        # Large plans go through the compiled kernel; small ones aren't
+        # worth the JIT dispatch
+        if len(plan) >= DEDUPE_KERNEL_MIN_FLASHES:
+            from .flash_kernels import dedupe_flashes
+
+            kept = dedupe_flashes(
+                np.ascontiguousarray(plan["timestamp"]),
+                np.ascontiguousarray(plan["duration"]),
+                np.ascontiguousarray(plan["intensity"]),
+                min_gap,
+            )
+            return plan[kept]
 
-        result = [flashes[0]]
+        timestamps = plan["timestamp"].tolist()
+        durations = plan["duration"].tolist()
+        intensities = plan["intensity"].tolist()
+        kept = [0]
 
-        for flash in flashes[1:]:
-            last_flash = result[-1]
-            last_end = last_flash.timestamp + last_flash.duration
+        for i in range(1, len(plan)):
+            last = kept[-1]
+            last_end = timestamps[last] + durations[last]
 
             # Check if there's enough gap
-            if flash.timestamp >= last_end + min_gap:
-                result.append(flash)
+            if timestamps[i] >= last_end + min_gap:
+                kept.append(i)
             else:
                 # Keep the higher intensity flash
-                if flash.intensity > last_flash.intensity:
-                    result[-1] = flash
+                if intensities[i] > intensities[last]:
+                    kept[-1] = i
 
-        return result
+        return plan[kept]
 
     def _get_video_dimensions(
         self,
-        video_path: str
+        video_path: str,
+        st: Optional[os.stat_result] = None
     ) -> tuple[Optional[int], Optional[int]]:
-        """Get the dimensions of a video file."""
-        cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height",
-            "-of", "csv=p=0:s=x",
-            video_path
-        ]
-
+        """Get the dimensions of a video file (cached per file version)."""
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode == 0:
-                parts = result.stdout.strip().split("x")
-                if len(parts) == 2:
-                    return int(parts[0]), int(parts[1])
-            return None, None
-
-        except (subprocess.TimeoutExpired, ValueError):
+            if st is None:
+                st = os.stat(video_path)
+            return _probe_dimensions(video_path, st.st_mtime_ns, st.st_size)
+        except (OSError, subprocess.TimeoutExpired, ValueError):
             return None, None
 
     def _copy_file(self, src: str, dst: str) -> bool:
@@ -512,8 +711,8 @@ class FlashFrameRenderer:
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, timeout=60)
-            return result.returncode == 0
+            returncode, _ = _run_ffmpeg(cmd, timeout=60, tail_lines=1)
+            return returncode == 0
         except subprocess.TimeoutExpired:
             return False
 
@@ -537,3 +736,13 @@ class FlashFrameRenderer:
             "first_flash": flashes[0].timestamp if flashes else 0,
             "last_flash": flashes[-1].timestamp if flashes else 0,
         }
+
+
+# Preset patterns parsed once: name -> [(offset, duration, color)]
+_PRESET_TEMPLATES: dict[str, list[tuple[float, float, FlashColor]]] = {
+    name: [
+        (flash_def["offset"], flash_def["duration"], FlashColor(flash_def.get("color", "white")))
+        for flash_def in pattern_data
+    ]
+    for name, pattern_data in FlashFrameRenderer.PRESET_PATTERNS.items()
+}
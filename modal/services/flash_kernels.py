@@ -0,0 +1,50 @@
+"""
+Numba kernels for flash frame planning.
+
+These let FlashFrameRenderer thin large flash plans in one typed pass over
+contiguous arrays instead of walking FlashConfig objects in Python. Serial
+for the same reason as beat_kernels: callers are worker threads.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def dedupe_flashes(
+    timestamps: np.ndarray,
+    durations: np.ndarray,
+    intensities: np.ndarray,
+    min_gap: float,
+) -> np.ndarray:
+    """Indices of the flashes kept after dropping overlapping ones.
+
+    Flashes must be sorted by timestamp. A flash is kept if it starts at
+    least min_gap after the last kept flash ends; otherwise it replaces the
+    last kept flash when its intensity is strictly higher.
+
+    Args:
+        timestamps: Flash start times in seconds, ascending
+        durations: Flash durations in seconds
+        intensities: Flash intensities (0-1)
+        min_gap: Minimum gap in seconds between kept flashes
+
+    Returns:
+        int64 array of kept indices, ascending
+    """
+    n = timestamps.shape[0]
+    kept = np.empty(n, dtype=np.int64)
+    if n == 0:
+        return kept
+
+    kept[0] = 0
+    k = 1
+    for i in range(1, n):
+        last = kept[k - 1]
+        if timestamps[i] >= timestamps[last] + durations[last] + min_gap:
+            kept[k] = i
+            k += 1
+        elif intensities[i] > intensities[last]:
+            kept[k - 1] = i
+
+    return kept[:k]
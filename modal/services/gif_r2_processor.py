@@ -22,17 +22,40 @@ Flow:
 """
 
 import os
+import re
 import asyncio
 import uuid
 import shutil
 import subprocess
 import json
+import hashlib
+import tempfile
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, field
 
 from .r2_fetcher import R2Fetcher
 from .convex_client import ConvexClient
+from .cpu_utils import container_cpus
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize a request body, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def _json_loads(data: str | bytes) -> Any:
+    """Parse JSON, using orjson when available (its errors subclass json.JSONDecodeError)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 # =============================================================================
@@ -55,6 +78,48 @@ MAX_GIF_DURATION = 8.0
 DEFAULT_GIF_WIDTH = 480
 DEFAULT_FRAME_RATE = 12
 
+# Downloaded sources (video + extracted audio) kept per container, keyed by
+# R2 key, so retries and other jobs on the same upload skip the download
+SOURCE_CACHE_DIRNAME = "_source_cache"
+SOURCE_CACHE_MAX_BYTES = 4 * 1024 ** 3
+
+# Progress updates within a stage are sent only once they advance this much
+PROGRESS_MIN_STEP = 2
+
+# Moments encoded and uploaded at the same time (each FFmpeg run is
+# multithreaded, so half the CPUs; at least 2 so uploads overlap encodes)
+GIF_CONCURRENCY = max(2, container_cpus() // 2)
+
+# H.264 settings for the MP4 version of each GIF (no audio for GIF-like clips)
+MP4_ENCODE_ARGS = [
+    "-c:v", "libx264",
+    "-preset", "veryfast",
+    "-crf", "23",
+    "-an",
+    "-movflags", "+faststart",
+]
+
+# Body of the first markdown code fence (```json or bare ```) in an LLM
+# reply; an unclosed fence runs to the end of the text
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)(?:```|$)", re.IGNORECASE)
+
+# Alternate key spellings the LLMs use for viral moment fields
+_MOMENT_KEY_ALIASES = {
+    "startTime": "start",
+    "start_time": "start",
+    "endTime": "end",
+    "end_time": "end",
+    "transcript_text": "text",
+    "transcriptText": "text",
+    "humorScore": "humor_score",
+    "viralScore": "viral_score",
+    "suggestedCaption": "suggested_caption",
+}
+
+# drawtext escaping: quotes close/reopen the quoted text, colons are
+# option separators, newlines become FFmpeg line breaks
+_DRAWTEXT_ESCAPES = str.maketrans({"'": "'\\''", ":": "\\:", "\n": "\\n"})
+
 # Overlay styles configuration
 OVERLAY_STYLES = {
     "meme_top_bottom": {
@@ -97,7 +162,7 @@ OVERLAY_STYLES = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class ViralMoment:
     """A detected viral/funny moment in the video."""
     start_time: float
@@ -146,6 +211,10 @@ class GifR2Processor:
         # Create job-specific directory
         os.makedirs(self.job_dir, exist_ok=True)
 
+        # Per-moment output paths, filled in with the moment index
+        self._gif_path_tpl = os.path.join(self.job_dir, "gif_{}.gif")
+        self._mp4_path_tpl = os.path.join(self.job_dir, "clip_{}.mp4")
+
         # Initialize services
         self.r2 = R2Fetcher(self.job_dir)
         self.convex = ConvexClient()
@@ -164,11 +233,29 @@ class GifR2Processor:
         self.overlay_style: str = "caption_bar"
         self.movie_metadata: Optional[Dict[str, Any]] = None
 
+        # Coalesced Convex progress updates (see _report_progress)
+        self._progress: int = -PROGRESS_MIN_STEP
+        self._progress_status: Optional[str] = None
+        self._pending_progress: Optional[tuple] = None
+        self._progress_sender: Optional[asyncio.Task] = None
+
+        # caption text -> drawtext filter (see _build_text_filter)
+        self._text_filter_cache: Dict[str, Optional[str]] = {}
+
     async def _get_http_client(self):
-        """Get or create HTTP client for API calls."""
+        """
+        Get or create HTTP client for API calls.
+
+        One pooled HTTP/2 client serves transcription and moment detection,
+        so the job reuses its TLS connections across calls.
+        """
         if self._http_client is None:
             import httpx
-            self._http_client = httpx.AsyncClient(timeout=120.0)
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(300.0, connect=10.0),
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            )
         return self._http_client
 
     async def process(self) -> GifR2ProcessingResult:
@@ -222,26 +309,25 @@ class GifR2Processor:
             # =================================================================
             # STEP 2: Download video from R2
             # =================================================================
-            await self.convex.update_gif_progress(
-                self.job_id, self.lock_id, 5, "downloading", "Downloading video..."
-            )
+            await self._report_progress(5, "downloading", "Downloading video...")
             print(f"[{self.job_id}] Downloading video from R2...")
 
+            # Blocking boto3/ffprobe calls, run off the event loop
+            loop = asyncio.get_running_loop()
             job_path = Path(self.job_dir)
-            video_path, audio_path = self.r2.download_source_video(
-                self.r2_source_key,
-                job_path,
+            video_path, audio_path = await loop.run_in_executor(
+                None, self._fetch_source, job_path
             )
 
-            video_duration = self.r2.get_video_duration(video_path)
+            video_duration = await loop.run_in_executor(
+                None, self.r2.get_video_duration, video_path
+            )
             print(f"[{self.job_id}] Video downloaded: duration={video_duration}s")
 
             # =================================================================
             # STEP 3: Transcribe with sentiment analysis
             # =================================================================
-            await self.convex.update_gif_progress(
-                self.job_id, self.lock_id, 15, "transcribing", "Transcribing audio with sentiment analysis..."
-            )
+            await self._report_progress(15, "transcribing", "Transcribing audio with sentiment analysis...")
             print(f"[{self.job_id}] Transcribing audio...")
 
             transcript_data = await self._transcribe_with_sentiment(str(audio_path))
@@ -254,9 +340,7 @@ class GifR2Processor:
             # =================================================================
             # STEP 4: Detect viral moments with AI
             # =================================================================
-            await self.convex.update_gif_progress(
-                self.job_id, self.lock_id, 35, "analyzing", "Detecting viral moments..."
-            )
+            await self._report_progress(35, "analyzing", "Detecting viral moments...")
             print(f"[{self.job_id}] Analyzing transcript for viral moments...")
 
             detected_moments = await self._detect_viral_moments(
@@ -294,80 +378,35 @@ class GifR2Processor:
             # =================================================================
             # STEP 5: Generate GIFs
             # =================================================================
-            await self.convex.update_gif_progress(
-                self.job_id, self.lock_id, 50, "generating", "Generating GIFs..."
-            )
+            await self._report_progress(50, "generating", "Generating GIFs...")
             print(f"[{self.job_id}] Generating {len(top_moments)} GIFs...")
 
-            for i, moment in enumerate(top_moments):
-                progress = 50 + int((i / len(top_moments)) * 40)
-                await self.convex.update_gif_progress(
-                    self.job_id, self.lock_id, progress, "generating",
-                    f"Creating GIF {i + 1}/{len(top_moments)}..."
+            # Moments are independent, so encode and upload several at once.
+            # Progress is reported as each one finishes.
+            semaphore = asyncio.Semaphore(GIF_CONCURRENCY)
+            completed = 0
+
+            async def process_one(i: int, moment: ViralMoment) -> Optional[Dict[str, Any]]:
+                nonlocal completed
+                async with semaphore:
+                    gif_data = await self._process_moment(i, moment, video_path, video_duration)
+                completed += 1
+                await self._report_progress(
+                    50 + int((completed / len(top_moments)) * 40),
+                    "generating", f"Created GIF {completed}/{len(top_moments)}..."
                 )
+                return gif_data
 
-                try:
-                    # Calculate actual duration (may be shorter at end of video)
-                    actual_duration = min(
-                        moment.end_time - moment.start_time,
-                        self.max_duration,
-                        video_duration - moment.start_time
-                    )
-
-                    # Determine caption text
-                    caption_text = moment.suggested_caption or moment.transcript_text
-
-                    # Generate GIF
-                    gif_path = await self._create_gif(
-                        video_path=str(video_path),
-                        start_time=moment.start_time,
-                        duration=actual_duration,
-                        caption_text=caption_text if self.overlay_style != "none" else None,
-                        output_index=i,
-                    )
-
-                    # Also generate MP4 version for better compatibility
-                    mp4_path = await self._create_mp4_version(
-                        video_path=str(video_path),
-                        start_time=moment.start_time,
-                        duration=actual_duration,
-                        caption_text=caption_text if self.overlay_style != "none" else None,
-                        output_index=i,
-                    )
-
-                    # Upload to R2
-                    r2_gif_key = self._upload_gif(gif_path, i)
-                    r2_mp4_key = self._upload_mp4(mp4_path, i) if mp4_path else None
-
-                    gif_data = {
-                        "index": i,
-                        "r2GifKey": r2_gif_key,
-                        "r2Mp4Key": r2_mp4_key,
-                        "startTime": moment.start_time,
-                        "endTime": moment.start_time + actual_duration,
-                        "duration": actual_duration,
-                        "transcriptText": moment.transcript_text,
-                        "captionText": caption_text,
-                        "overlayStyle": self.overlay_style,
-                        "humorScore": moment.humor_score,
-                        "viralScore": moment.viral_score,
-                        "emotion": moment.emotion,
-                        "reason": moment.reason,
-                        "width": self.target_width,
-                        "frameRate": self.frame_rate,
-                    }
-                    gifs.append(gif_data)
-                    print(f"[{self.job_id}] GIF {i + 1} created and uploaded")
-
-                except Exception as e:
-                    print(f"[{self.job_id}] GIF generation failed for moment {i}: {e}")
+            # gather keeps moment order, so gifs stay sorted by index
+            results = await asyncio.gather(
+                *[process_one(i, moment) for i, moment in enumerate(top_moments)]
+            )
+            gifs.extend(gif_data for gif_data in results if gif_data is not None)
 
             # =================================================================
             # STEP 6: Complete job
             # =================================================================
-            await self.convex.update_gif_progress(
-                self.job_id, self.lock_id, 95, "completing", "Finalizing..."
-            )
+            await self._report_progress(95, "completing", "Finalizing...")
             print(f"[{self.job_id}] Completing GIF job...")
 
             complete_result = await self.convex.complete_gif_processing(
@@ -424,6 +463,7 @@ class GifR2Processor:
             print(f"[{self.job_id}] GIF processing error at {error_stage}: {error_msg}")
 
             # Try to fail the job in Convex
+            await self._flush_progress()
             try:
                 await self.convex.fail_gif_processing(
                     job_id=self.job_id,
@@ -452,6 +492,214 @@ class GifR2Processor:
             # Close Convex client
             await self.convex.close()
 
+    def _fetch_source(self, job_path: Path) -> tuple[Path, Path]:
+        """
+        Get the source video and its audio into the job directory.
+
+        Sources are cached under temp_dir/SOURCE_CACHE_DIRNAME by a hash of
+        the R2 key and hard-linked into the job directory (cleanup removes
+        only the links). A miss downloads into a staging directory that is
+        renamed into place, so concurrent jobs never see a partial entry.
+        An entry evicted by another job before it could be linked counts as
+        a miss.
+
+        Returns:
+            Tuple of (video_path, audio_path) inside job_path
+        """
+        cache_root = Path(self.temp_dir) / SOURCE_CACHE_DIRNAME
+        cache_root.mkdir(parents=True, exist_ok=True)
+        entry = cache_root / hashlib.sha1(self.r2_source_key.encode()).hexdigest()
+
+        if entry.is_dir():
+            try:
+                os.utime(entry)
+                linked = self._link_source(entry, job_path)
+                print(f"[{self.job_id}] Using cached source for {self.r2_source_key}")
+                return linked
+            except OSError:
+                # Evicted by a concurrent job since the check
+                pass
+
+        staging = Path(tempfile.mkdtemp(dir=cache_root, prefix=f".{entry.name}_"))
+        try:
+            self.r2.download_source_video(self.r2_source_key, staging)
+            # Link before publishing, so a concurrent eviction of the entry
+            # can't take the files from under this job
+            linked = self._link_source(staging, job_path)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        try:
+            os.rename(staging, entry)
+        except OSError:
+            # Another job cached the same source first
+            shutil.rmtree(staging, ignore_errors=True)
+        self._evict_source_cache(cache_root, keep=entry)
+        return linked
+
+    @staticmethod
+    def _link_source(source_dir: Path, job_path: Path) -> tuple[Path, Path]:
+        """Hard-link (or copy) a downloaded source's video and audio into job_path."""
+        linked = []
+        # R2Fetcher.download_source_video's file names
+        for name in ("source_video.mp4", "audio.mp3"):
+            dst = job_path / name
+            dst.unlink(missing_ok=True)
+            try:
+                os.link(source_dir / name, dst)
+            except OSError:
+                shutil.copy2(source_dir / name, dst)
+            linked.append(dst)
+        return linked[0], linked[1]
+
+    @staticmethod
+    def _evict_source_cache(cache_root: Path, keep: Path) -> None:
+        """Drop least recently used cached sources beyond SOURCE_CACHE_MAX_BYTES.
+
+        Best effort: entries other jobs are evicting at the same time are
+        skipped.
+        """
+        entries = []
+        for entry in cache_root.iterdir():
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+                entries.append((entry.stat().st_mtime, size, entry))
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= SOURCE_CACHE_MAX_BYTES:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    async def _report_progress(self, progress: int, status: str, current_step: str) -> None:
+        """
+        Send a Convex progress update, coalescing updates within a stage.
+
+        A new stage is waited for, since blocking work often follows it.
+        Updates within the same stage that advance less than
+        PROGRESS_MIN_STEP points are skipped, and the rest are queued
+        without waiting: one sender task delivers them in order, and an
+        update superseded before it is sent is dropped, so concurrent
+        moments never queue up RPCs.
+        """
+        stage_changed = status != self._progress_status
+        if not stage_changed and progress - self._progress < PROGRESS_MIN_STEP:
+            return
+        self._progress = progress
+        self._progress_status = status
+        self._pending_progress = (progress, status, current_step)
+
+        if self._progress_sender is None or self._progress_sender.done():
+            self._progress_sender = asyncio.create_task(self._send_progress())
+
+        if stage_changed:
+            await self._flush_progress()
+
+    async def _send_progress(self) -> None:
+        """Send the latest pending progress update until none is left."""
+        while self._pending_progress is not None:
+            progress, status, current_step = self._pending_progress
+            self._pending_progress = None
+            try:
+                await self.convex.update_gif_progress(
+                    self.job_id, self.lock_id, progress, status, current_step
+                )
+            except Exception as e:
+                print(f"[{self.job_id}] Progress update failed: {e}")
+
+    async def _flush_progress(self) -> None:
+        """Wait until all queued progress updates have been sent."""
+        if self._progress_sender is not None:
+            await self._progress_sender
+
+    async def _process_moment(
+        self,
+        i: int,
+        moment: ViralMoment,
+        video_path: Path,
+        video_duration: float,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Create and upload the GIF and MP4 for one moment.
+
+        Returns:
+            The gif data dict for Convex, or None if this moment failed
+        """
+        try:
+            # Calculate actual duration (may be shorter at end of video)
+            actual_duration = min(
+                moment.end_time - moment.start_time,
+                self.max_duration,
+                video_duration - moment.start_time
+            )
+
+            # Determine caption text
+            caption_text = moment.suggested_caption or moment.transcript_text
+
+            encode_args = dict(
+                video_path=str(video_path),
+                start_time=moment.start_time,
+                duration=actual_duration,
+                caption_text=caption_text if self.overlay_style != "none" else None,
+                output_index=i,
+            )
+
+            # GIF plus an MP4 version for better compatibility, from one
+            # decode of the segment; separate runs if that fails
+            outputs = await self._create_gif_and_mp4(**encode_args)
+            if outputs:
+                gif_path, mp4_path = outputs
+            else:
+                gif_path = await self._create_gif(**encode_args)
+                mp4_path = await self._create_mp4_version(**encode_args)
+
+            # Upload to R2 (boto3 blocks, so off the event loop), GIF and
+            # MP4 side by side
+            loop = asyncio.get_running_loop()
+            gif_upload = loop.run_in_executor(None, self._upload_gif, gif_path, i)
+            mp4_upload = (
+                loop.run_in_executor(None, self._upload_mp4, mp4_path, i)
+                if mp4_path else None
+            )
+            r2_gif_key = await gif_upload
+            r2_mp4_key = await mp4_upload if mp4_upload else None
+
+            # Uploaded outputs aren't needed locally any more; free the
+            # space now rather than when the job directory is removed
+            for path in (gif_path, mp4_path):
+                if path:
+                    Path(path).unlink(missing_ok=True)
+
+            print(f"[{self.job_id}] GIF {i + 1} created and uploaded")
+            return {
+                "index": i,
+                "r2GifKey": r2_gif_key,
+                "r2Mp4Key": r2_mp4_key,
+                "startTime": moment.start_time,
+                "endTime": moment.start_time + actual_duration,
+                "duration": actual_duration,
+                "transcriptText": moment.transcript_text,
+                "captionText": caption_text,
+                "overlayStyle": self.overlay_style,
+                "humorScore": moment.humor_score,
+                "viralScore": moment.viral_score,
+                "emotion": moment.emotion,
+                "reason": moment.reason,
+                "width": self.target_width,
+                "frameRate": self.frame_rate,
+            }
+
+        except Exception as e:
+            print(f"[{self.job_id}] GIF generation failed for moment {i}: {e}")
+            return None
+
     async def _transcribe_with_sentiment(self, audio_path: str) -> Dict[str, Any]:
         """
         Transcribe audio using OpenAI Whisper API.
@@ -463,21 +711,19 @@ class GifR2Processor:
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY not configured")
 
-        import httpx
-
-        # Read audio file
-        with open(audio_path, "rb") as f:
-            audio_data = f.read()
+        client = await self._get_http_client()
 
-        # Use OpenAI Whisper API
-        async with httpx.AsyncClient(timeout=300.0) as client:
+        # Use OpenAI Whisper API. The open file is passed to httpx, which
+        # streams it into the multipart body in chunks (Content-Length comes
+        # from the file size) instead of holding the whole audio in memory.
+        with open(audio_path, "rb") as audio_file:
             response = await client.post(
                 "https://api.openai.com/v1/audio/transcriptions",
                 headers={
                     "Authorization": f"Bearer {OPENAI_API_KEY}",
                 },
                 files={
-                    "file": ("audio.mp3", audio_data, "audio/mpeg"),
+                    "file": ("audio.mp3", audio_file, "audio/mpeg"),
                 },
                 data={
                     "model": "whisper-1",
@@ -489,7 +735,7 @@ class GifR2Processor:
             if response.status_code != 200:
                 raise Exception(f"Whisper API error: {response.status_code} - {response.text}")
 
-            result = response.json()
+            result = _json_loads(response.content)
 
         # Parse segments
         segments = []
@@ -519,12 +765,23 @@ class GifR2Processor:
         if not transcript_segments:
             return []
 
+        # Build context from segments (once, shared by both providers)
+        segment_text = "\n".join(
+            f"[{seg['start']:.1f}s - {seg['end']:.1f}s]: {seg['text']}"
+            for seg in transcript_segments
+        )
+
+        # Movie context if available
+        context_info = ""
+        if self.movie_metadata:
+            context_info = f"\n\nContext: This is from \"{self.movie_metadata.get('title', 'a video')}\". {self.movie_metadata.get('logline', '')} Genre: {self.movie_metadata.get('genre', 'Unknown')}"
+
         # Try OpenAI first, fall back to Gemini on failure
         openai_error = None
         if OPENAI_API_KEY:
             try:
                 return await self._detect_viral_moments_openai(
-                    transcript_segments, video_duration
+                    segment_text, context_info, video_duration
                 )
             except Exception as e:
                 openai_error = str(e)
@@ -534,7 +791,7 @@ class GifR2Processor:
         if GEMINI_API_KEY:
             try:
                 return await self._detect_viral_moments_gemini(
-                    transcript_segments, video_duration
+                    segment_text, context_info, video_duration
                 )
             except Exception as e:
                 print(f"[{self.job_id}] Gemini viral detection also failed: {e}")
@@ -546,21 +803,11 @@ class GifR2Processor:
 
     async def _detect_viral_moments_openai(
         self,
-        transcript_segments: List[Dict[str, Any]],
+        segment_text: str,
+        context_info: str,
         video_duration: float,
     ) -> List[ViralMoment]:
         """Use OpenAI GPT-4o to detect viral/funny moments."""
-        # Build context from segments
-        segment_text = "\n".join([
-            f"[{seg['start']:.1f}s - {seg['end']:.1f}s]: {seg['text']}"
-            for seg in transcript_segments
-        ])
-
-        # Movie context if available
-        context_info = ""
-        if self.movie_metadata:
-            context_info = f"\n\nContext: This is from \"{self.movie_metadata.get('title', 'a video')}\". {self.movie_metadata.get('logline', '')} Genre: {self.movie_metadata.get('genre', 'Unknown')}"
-
         client = await self._get_http_client()
 
         response = await client.post(
@@ -569,7 +816,7 @@ class GifR2Processor:
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
             },
-            json={
+            content=_json_dumps({
                 "model": "gpt-4o",
                 "messages": [
                     {
@@ -593,8 +840,7 @@ For each moment, provide:
 - Reason: Why this moment is GIF-worthy (1-2 sentences)
 - Suggested caption: Optional improved/funnier text for the GIF overlay
 
-Return a JSON array with up to {self.gif_count * 2} moments (we'll select the best).
-Return ONLY valid JSON, no markdown code blocks.""",
+Return a JSON object of the form {{"moments": [...]}} with up to {self.gif_count * 2} moments (we'll select the best).""",
                     },
                     {
                         "role": "user",
@@ -602,40 +848,32 @@ Return ONLY valid JSON, no markdown code blocks.""",
 
 {segment_text}{context_info}
 
-Return the moments as a JSON array.""",
+Return the moments as a JSON object with a "moments" array.""",
                     },
                 ],
+                # JSON mode: the reply is always a parseable JSON object
+                "response_format": {"type": "json_object"},
                 "max_tokens": 2000,
                 "temperature": 0.7,
-            },
+            }),
             timeout=60.0,
         )
 
         if response.status_code != 200:
             raise Exception(f"OpenAI API error: {response.status_code}")
 
-        result = response.json()
+        result = _json_loads(response.content)
         content = result["choices"][0]["message"]["content"]
 
         return self._parse_viral_moments(content, video_duration)
 
     async def _detect_viral_moments_gemini(
         self,
-        transcript_segments: List[Dict[str, Any]],
+        segment_text: str,
+        context_info: str,
         video_duration: float,
     ) -> List[ViralMoment]:
         """Use Google Gemini as fallback for viral moment detection."""
-        # Build context from segments
-        segment_text = "\n".join([
-            f"[{seg['start']:.1f}s - {seg['end']:.1f}s]: {seg['text']}"
-            for seg in transcript_segments
-        ])
-
-        # Movie context if available
-        context_info = ""
-        if self.movie_metadata:
-            context_info = f"\n\nContext: This is from \"{self.movie_metadata.get('title', 'a video')}\". {self.movie_metadata.get('logline', '')} Genre: {self.movie_metadata.get('genre', 'Unknown')}"
-
         prompt = f"""You are an expert at identifying viral, funny, and shareable moments in video transcripts.
 Analyze the transcript and identify the best moments for GIF generation.
 
@@ -667,13 +905,13 @@ Return ONLY valid JSON, no markdown code blocks."""
         response = await client.post(
             f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
             headers={"Content-Type": "application/json"},
-            json={
+            content=_json_dumps({
                 "contents": [{"parts": [{"text": prompt}]}],
                 "generationConfig": {
                     "temperature": 0.7,
                     "maxOutputTokens": 2000,
                 },
-            },
+            }),
             timeout=60.0,
         )
 
@@ -681,7 +919,7 @@ Return ONLY valid JSON, no markdown code blocks."""
             error_text = response.text[:500] if response.text else "No error details"
             raise Exception(f"Gemini API error {response.status_code}: {error_text}")
 
-        result = response.json()
+        result = _json_loads(response.content)
         candidates = result.get("candidates", [])
         if not candidates:
             raise Exception("Gemini returned no candidates")
@@ -701,21 +939,31 @@ Return ONLY valid JSON, no markdown code blocks."""
         """Parse viral moments from JSON response."""
         # Parse JSON from response
         try:
-            moments_data = json.loads(content)
+            moments_data = _json_loads(content)
         except json.JSONDecodeError:
             # Try to extract JSON from markdown
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-            moments_data = json.loads(content.strip())
+            fence = _JSON_FENCE_RE.search(content)
+            if fence:
+                content = fence.group(1)
+            moments_data = _json_loads(content.strip())
+
+        # OpenAI's JSON mode wraps the array in {"moments": [...]}
+        if isinstance(moments_data, dict):
+            moments_data = moments_data.get("moments", [])
 
         # Convert to ViralMoment objects
         moments = []
-        for m in moments_data:
+        for raw in moments_data:
             try:
-                start = float(m.get("start", m.get("startTime", m.get("start_time", 0))))
-                end = float(m.get("end", m.get("endTime", m.get("end_time", start + 3))))
+                # Canonical key names; a canonical key beats its aliases
+                m = {}
+                for key, value in raw.items():
+                    name = _MOMENT_KEY_ALIASES.get(key, key)
+                    if key == name or name not in m:
+                        m[name] = value
+
+                start = float(m.get("start", 0))
+                end = float(m.get("end", start + 3))
 
                 # Validate times
                 if start < 0:
@@ -728,12 +976,12 @@ Return ONLY valid JSON, no markdown code blocks."""
                 moments.append(ViralMoment(
                     start_time=start,
                     end_time=end,
-                    transcript_text=m.get("text", m.get("transcript_text", m.get("transcriptText", ""))),
-                    humor_score=float(m.get("humor_score", m.get("humorScore", 50))),
-                    viral_score=float(m.get("viral_score", m.get("viralScore", 50))),
+                    transcript_text=m.get("text", ""),
+                    humor_score=float(m.get("humor_score", 50)),
+                    viral_score=float(m.get("viral_score", 50)),
                     emotion=m.get("emotion", "neutral"),
                     reason=m.get("reason", "Interesting moment"),
-                    suggested_caption=m.get("suggested_caption", m.get("suggestedCaption")),
+                    suggested_caption=m.get("suggested_caption"),
                 ))
             except (KeyError, ValueError, TypeError) as e:
                 print(f"[{self.job_id}] Skipping invalid moment: {e}")
@@ -752,33 +1000,28 @@ Return ONLY valid JSON, no markdown code blocks."""
         """
         Create a GIF from a video segment with optional text overlay.
         Uses FFmpeg with palette optimization for high-quality GIFs.
-        """
-        output_path = os.path.join(self.job_dir, f"gif_{output_index}.gif")
-        palette_path = os.path.join(self.job_dir, f"palette_{output_index}.png")
-
-        # Build filter complex for text overlay
-        filters = [f"fps={self.frame_rate}", f"scale={self.target_width}:-1:flags=lanczos"]
-
-        if caption_text and self.overlay_style != "none":
-            text_filter = self._build_text_filter(caption_text)
-            if text_filter:
-                filters.append(text_filter)
 
-        filter_str = ",".join(filters)
+        The palette is generated and applied in one FFmpeg run: the filtered
+        frames are split, one branch feeds palettegen and the other is held
+        by paletteuse until the palette is ready, so the segment is decoded
+        once and no palette file is written.
+        """
+        output_path = self._gif_path_tpl.format(output_index)
+        filter_str = self._gif_filters(caption_text)
 
-        # Step 1: Generate palette for better colors
-        palette_cmd = [
+        gif_cmd = [
             "ffmpeg", "-y",
             "-ss", str(start_time),
             "-t", str(duration),
             "-i", video_path,
-            "-vf", f"{filter_str},palettegen=stats_mode=diff",
-            palette_path,
+            "-filter_complex", self._palette_gif_graph(f"[0:v]{filter_str}"),
+            "-gifflags", "+transdiff",
+            output_path,
         ]
 
-        result = subprocess.run(palette_cmd, capture_output=True, timeout=60)
-        if result.returncode != 0:
-            print(f"[{self.job_id}] Palette generation warning: {result.stderr.decode()[:200]}")
+        returncode, stderr = await self._run_ffmpeg(gif_cmd, timeout=120)
+        if returncode != 0:
+            print(f"[{self.job_id}] Palette GIF encoding warning: {stderr[:200]}")
             # Fall back to simple GIF without palette
             simple_cmd = [
                 "ffmpeg", "-y",
@@ -788,29 +1031,94 @@ Return ONLY valid JSON, no markdown code blocks."""
                 "-vf", filter_str,
                 output_path,
             ]
-            subprocess.run(simple_cmd, capture_output=True, timeout=60)
-            return output_path
+            returncode, stderr = await self._run_ffmpeg(simple_cmd)
+            if returncode != 0:
+                raise Exception(f"GIF encoding failed: {stderr[:500]}")
 
-        # Step 2: Generate GIF with palette
-        gif_cmd = [
+        return output_path
+
+    async def _create_gif_and_mp4(
+        self,
+        video_path: str,
+        start_time: float,
+        duration: float,
+        caption_text: Optional[str],
+        output_index: int,
+    ) -> Optional[tuple[str, str]]:
+        """
+        Create the GIF and its MP4 version in one FFmpeg run.
+
+        The segment is seeked and decoded once and split between the
+        palette GIF chain and the H.264 chain, instead of once per output.
+
+        Returns:
+            (gif_path, mp4_path), or None if the run failed (the caller then
+            encodes them separately, with the GIF fallbacks)
+        """
+        gif_path = self._gif_path_tpl.format(output_index)
+        mp4_path = self._mp4_path_tpl.format(output_index)
+
+        cmd = [
             "ffmpeg", "-y",
             "-ss", str(start_time),
             "-t", str(duration),
             "-i", video_path,
-            "-i", palette_path,
-            "-lavfi", f"{filter_str} [x]; [x][1:v] paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle",
-            output_path,
+            "-filter_complex",
+            f"[0:v]split[g][m];"
+            f"{self._palette_gif_graph(f'[g]{self._gif_filters(caption_text)}', '[gif]')};"
+            f"[m]{self._mp4_filters(caption_text)}[mp4]",
+            "-map", "[gif]",
+            "-gifflags", "+transdiff",
+            gif_path,
+            "-map", "[mp4]",
+            *MP4_ENCODE_ARGS,
+            mp4_path,
         ]
 
-        result = subprocess.run(gif_cmd, capture_output=True, timeout=120)
-        if result.returncode != 0:
-            raise Exception(f"GIF encoding failed: {result.stderr.decode()[:500]}")
+        try:
+            returncode, stderr = await self._run_ffmpeg(cmd, timeout=120)
+        except subprocess.TimeoutExpired:
+            print(f"[{self.job_id}] Combined GIF/MP4 encoding timed out")
+            return None
+
+        if returncode != 0:
+            print(f"[{self.job_id}] Combined GIF/MP4 encoding warning: {stderr[:200]}")
+            return None
+
+        return gif_path, mp4_path
 
-        # Clean up palette
-        if os.path.exists(palette_path):
-            os.remove(palette_path)
+    def _gif_filters(self, caption_text: Optional[str]) -> str:
+        """Frame rate, scale and overlay filters for the GIF output."""
+        # fps goes first so lanczos, drawtext and the palette filters only
+        # see the frames that are kept
+        filters = [f"fps={self.frame_rate}", f"scale={self.target_width}:-1:flags=lanczos"]
 
-        return output_path
+        if caption_text and self.overlay_style != "none":
+            text_filter = self._build_text_filter(caption_text)
+            if text_filter:
+                filters.append(text_filter)
+
+        return ",".join(filters)
+
+    def _mp4_filters(self, caption_text: Optional[str]) -> str:
+        """Scale and overlay filters for the MP4 output."""
+        filters = [f"scale={self.target_width}:-2"]
+
+        if caption_text and self.overlay_style != "none":
+            text_filter = self._build_text_filter(caption_text)
+            if text_filter:
+                filters.append(text_filter)
+
+        return ",".join(filters)
+
+    @staticmethod
+    def _palette_gif_graph(source: str, output_label: str = "") -> str:
+        """Split source into palettegen and paletteuse, optionally labeling the GIF output."""
+        return (
+            f"{source},split[a][b];"
+            f"[a]palettegen=stats_mode=diff[p];"
+            f"[b][p]paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle{output_label}"
+        )
 
     async def _create_mp4_version(
         self,
@@ -824,43 +1132,59 @@ Return ONLY valid JSON, no markdown code blocks."""
         Create an MP4 version of the GIF for better compatibility.
         MP4s are smaller and play better on most platforms.
         """
-        output_path = os.path.join(self.job_dir, f"clip_{output_index}.mp4")
-
-        # Build filter complex
-        filters = [f"scale={self.target_width}:-2"]
-
-        if caption_text and self.overlay_style != "none":
-            text_filter = self._build_text_filter(caption_text)
-            if text_filter:
-                filters.append(text_filter)
-
-        filter_str = ",".join(filters)
+        output_path = self._mp4_path_tpl.format(output_index)
 
         cmd = [
             "ffmpeg", "-y",
             "-ss", str(start_time),
             "-t", str(duration),
             "-i", video_path,
-            "-vf", filter_str,
-            "-c:v", "libx264",
-            "-preset", "fast",
-            "-crf", "23",
-            "-an",  # No audio for GIF-like clips
-            "-movflags", "+faststart",
+            "-vf", self._mp4_filters(caption_text),
+            *MP4_ENCODE_ARGS,
             output_path,
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, timeout=60)
-            if result.returncode == 0:
+            returncode, stderr = await self._run_ffmpeg(cmd)
+            if returncode == 0:
                 return output_path
             else:
-                print(f"[{self.job_id}] MP4 creation failed: {result.stderr.decode()[:200]}")
+                print(f"[{self.job_id}] MP4 creation failed: {stderr[:200]}")
                 return None
         except Exception as e:
             print(f"[{self.job_id}] MP4 creation error: {e}")
             return None
 
+    async def _run_ffmpeg(self, argv: List[str], timeout: float = 60) -> tuple[int, str]:
+        """
+        Run an FFmpeg command without blocking the event loop.
+
+        FFmpeg gets no stdin and only logs errors, so concurrent encodes
+        can't contend for the terminal and the stderr excerpts callers
+        print are the error rather than the version banner.
+
+        Returns:
+            (returncode, stderr text)
+
+        Raises:
+            subprocess.TimeoutExpired: If FFmpeg runs longer than timeout
+                (the process is killed first)
+        """
+        process = await asyncio.create_subprocess_exec(
+            argv[0], "-nostdin", "-hide_banner", "-loglevel", "error", *argv[1:],
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise subprocess.TimeoutExpired(argv, timeout)
+
+        return process.returncode, stderr.decode(errors="replace")
+
     def _wrap_text_for_gif(self, text: str, max_chars_per_line: int = 20) -> str:
         """
         Wrap text for GIF overlay to prevent overflow.
@@ -872,7 +1196,19 @@ Return ONLY valid JSON, no markdown code blocks."""
         return wrapped
 
     def _build_text_filter(self, caption_text: str) -> Optional[str]:
-        """Build FFmpeg drawtext filter based on overlay style."""
+        """
+        Build FFmpeg drawtext filter based on overlay style.
+
+        The overlay style and width are fixed once the job is claimed, so
+        the filter depends only on the caption and is built once per
+        caption (the GIF and MP4 chains of a moment share it).
+        """
+        if caption_text not in self._text_filter_cache:
+            self._text_filter_cache[caption_text] = self._compose_text_filter(caption_text)
+        return self._text_filter_cache[caption_text]
+
+    def _compose_text_filter(self, caption_text: str) -> Optional[str]:
+        """Compose the drawtext filter for a caption (see _build_text_filter)."""
         style = OVERLAY_STYLES.get(self.overlay_style, OVERLAY_STYLES["caption_bar"])
 
         if style.get("position") == "none":
@@ -885,7 +1221,7 @@ Return ONLY valid JSON, no markdown code blocks."""
 
         # Escape special characters for FFmpeg drawtext
         # Replace newlines with FFmpeg's line break syntax
-        escaped_text = wrapped_text.replace("'", "'\\''").replace(":", "\\:").replace("\n", "\\n")
+        escaped_text = wrapped_text.translate(_DRAWTEXT_ESCAPES)
 
         # Get font settings
         font_family = style.get("fontFamily", "Arial")
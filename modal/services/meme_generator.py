@@ -13,7 +13,11 @@ AI-powered meme generation from video frames:
 import os
 import asyncio
 import base64
+import contextlib
+import functools
+import hashlib
 import json
+import shutil
 import subprocess
 import tempfile
 import textwrap
@@ -23,6 +27,8 @@ from dataclasses import dataclass, field
 import httpx
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 
+from .cpu_utils import container_cpus
+
 
 # =============================================================================
 # CONFIGURATION
@@ -38,6 +44,7 @@ GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini
 # Frame extraction settings
 DEFAULT_FRAME_COUNT = 12  # Number of frames to extract for analysis
 MIN_MEMEABILITY_SCORE = 40  # Minimum score to consider a frame for memes
+FRAME_EXTRACT_CONCURRENCY = max(1, container_cpus() // 2)  # FFmpeg processes at once (each is multithreaded)
 
 # Meme image composition settings
 MEME_OUTPUT_SIZE = 1080  # Square meme output size (1080x1080 for Instagram)
@@ -45,38 +52,54 @@ MEME_FONT_SIZE_RATIO = 0.07  # Font size as ratio of image height
 MEME_PADDING_RATIO = 0.03  # Padding from edges as ratio of image size
 MEME_MAX_CHARS_PER_LINE = 18  # Max characters before wrapping (reduced from 25 to prevent overflow)
 
+# Composed memes cached per container, keyed by frame content + caption/layout
+MEME_CACHE_DIR = os.path.join(tempfile.gettempdir(), "meme_cache")
+MEME_CACHE_MAX_ENTRIES = 200
+
 
 # =============================================================================
 # MEME IMAGE COMPOSITION
 # =============================================================================
 
+# Common bold/impact fonts in order of preference
+MEME_FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+    "/usr/share/fonts/truetype/freefont/FreeSansBold.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans-Bold.ttf",
+    "/System/Library/Fonts/Helvetica.ttc",  # macOS
+    "C:/Windows/Fonts/impact.ttf",  # Windows
+    "C:/Windows/Fonts/arialbd.ttf",  # Windows fallback
+]
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_font_path() -> Optional[str]:
+    """First loadable font in MEME_FONT_PATHS (probed once per process)."""
+    for font_path in MEME_FONT_PATHS:
+        try:
+            ImageFont.truetype(font_path, MEME_OUTPUT_SIZE // 20)
+            return font_path
+        except (IOError, OSError):
+            continue
+    return None
+
+
+@functools.lru_cache(maxsize=64)
 def get_meme_font(size: int) -> ImageFont.FreeTypeFont:
     """
     Get a bold font suitable for meme text.
     Falls back through several options to find an available font.
+
+    The font file is resolved once and each size is loaded once, so
+    composing a batch of memes doesn't re-probe the filesystem.
     """
-    # Try common bold/impact fonts in order of preference
-    font_paths = [
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
-        "/usr/share/fonts/truetype/freefont/FreeSansBold.ttf",
-        "/usr/share/fonts/TTF/DejaVuSans-Bold.ttf",
-        "/System/Library/Fonts/Helvetica.ttc",  # macOS
-        "C:/Windows/Fonts/impact.ttf",  # Windows
-        "C:/Windows/Fonts/arialbd.ttf",  # Windows fallback
-    ]
-
-    for font_path in font_paths:
-        try:
-            return ImageFont.truetype(font_path, size)
-        except (IOError, OSError):
-            continue
+    font_path = _resolve_font_path()
+    if font_path is not None:
+        return ImageFont.truetype(font_path, size)
 
     # Final fallback to default font
-    try:
-        return ImageFont.load_default()
-    except Exception:
-        return ImageFont.load_default()
+    return ImageFont.load_default()
 
 
 def crop_to_square(image: Image.Image, focus_point: Optional[Tuple[float, float]] = None) -> Image.Image:
@@ -132,17 +155,18 @@ def draw_text_with_outline(
 ) -> None:
     """
     Draw text with an outline effect (classic meme style).
-    """
-    x, y = position
-
-    # Draw outline by drawing text multiple times offset in each direction
-    for dx in range(-outline_width, outline_width + 1):
-        for dy in range(-outline_width, outline_width + 1):
-            if dx != 0 or dy != 0:
-                draw.text((x + dx, y + dy), text, font=font, fill=outline_color)
 
-    # Draw the main text
-    draw.text(position, text, font=font, fill=fill_color)
+    Uses FreeType's stroker (one rasterization) rather than redrawing the
+    text at every offset around the outline.
+    """
+    draw.text(
+        position,
+        text,
+        font=font,
+        fill=fill_color,
+        stroke_width=outline_width,
+        stroke_fill=outline_color,
+    )
 
 
 def compose_meme_image(
@@ -165,6 +189,21 @@ def compose_meme_image(
     Returns:
         Path to the composed meme image
     """
+    # Determine output path
+    if output_path is None:
+        base, _ = os.path.splitext(frame_path)
+        output_path = f"{base}_meme.jpg"
+
+    # Same frame, caption and layout -> same meme; reuse an earlier render
+    cache_path = _meme_cache_path(frame_path, caption, caption_position, output_size)
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            shutil.copyfile(cache_path, output_path)
+            os.utime(cache_path)
+            return output_path
+        except OSError:
+            pass
+
     # Load and process the image
     image = Image.open(frame_path).convert("RGB")
 
@@ -213,17 +252,62 @@ def compose_meme_image(
         wrapped = textwrap.fill(caption, width=MEME_MAX_CHARS_PER_LINE)
         _draw_meme_text(draw, wrapped, font, output_size, padding, outline_width, position="bottom")
 
-    # Determine output path
-    if output_path is None:
-        base, _ = os.path.splitext(frame_path)
-        output_path = f"{base}_meme.jpg"
-
     # Save the meme
     image.save(output_path, "JPEG", quality=95)
 
+    if cache_path is not None:
+        _store_in_meme_cache(output_path, cache_path)
+
     return output_path
 
 
+def _meme_cache_path(
+    frame_path: str,
+    caption: str,
+    caption_position: str,
+    output_size: int,
+) -> Optional[str]:
+    """Cache file for a meme, keyed by frame content and layout (None if unreadable)."""
+    try:
+        with open(frame_path, "rb") as f:
+            digest = hashlib.blake2b(f.read(), digest_size=16)
+    except OSError:
+        return None
+    digest.update(f"\0{caption}\0{caption_position}\0{output_size}".encode())
+    return os.path.join(MEME_CACHE_DIR, f"{digest.hexdigest()}.jpg")
+
+
+def _store_in_meme_cache(output_path: str, cache_path: str) -> None:
+    """Copy a composed meme into the cache, evicting least recently used entries."""
+    tmp_path = None
+    try:
+        os.makedirs(MEME_CACHE_DIR, exist_ok=True)
+        # Write under a temp name and rename, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=MEME_CACHE_DIR, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(output_path, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Meme cache write failed: {e}")
+        if tmp_path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+        return
+
+    # Other workers may be evicting too; entries they remove first are skipped
+    entries = []
+    with contextlib.suppress(OSError):
+        for entry in os.scandir(MEME_CACHE_DIR):
+            if entry.name.endswith(".jpg"):
+                with contextlib.suppress(FileNotFoundError):
+                    entries.append((entry.stat().st_mtime, entry.path))
+    if len(entries) > MEME_CACHE_MAX_ENTRIES:
+        entries.sort()
+        for _, path in entries[:len(entries) - MEME_CACHE_MAX_ENTRIES]:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+
+
 def _draw_meme_text(
     draw: ImageDraw.ImageDraw,
     text: str,
@@ -242,22 +326,25 @@ def _draw_meme_text(
     # Maximum width available for text (accounting for padding and outline)
     max_text_width = image_size - (2 * padding) - (2 * outline_width)
 
+    def text_width(value: str) -> int:
+        bbox = draw.textbbox((0, 0), value, font=font)
+        return bbox[2] - bbox[0]
+
     # Process lines to ensure they fit within image bounds
     processed_lines = []
     for line in lines:
-        bbox = draw.textbbox((0, 0), line, font=font)
-        text_width = bbox[2] - bbox[0]
-
         # If line is too wide, truncate it with ellipsis
-        if text_width > max_text_width:
-            # Binary search for the right truncation point
-            truncated = line
-            while text_width > max_text_width and len(truncated) > 3:
-                truncated = truncated[:-1]
-                test_text = truncated.rstrip() + "..."
-                bbox = draw.textbbox((0, 0), test_text, font=font)
-                text_width = bbox[2] - bbox[0]
-            processed_lines.append(truncated.rstrip() + "..." if truncated != line else line)
+        if len(line) > 3 and text_width(line) > max_text_width:
+            # Binary search for the longest prefix that fits with the
+            # ellipsis (width grows with prefix length); never below 3 chars
+            lo, hi = 3, len(line) - 1
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if text_width(line[:mid].rstrip() + "...") <= max_text_width:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            processed_lines.append(line[:lo].rstrip() + "...")
         else:
             processed_lines.append(line)
 
@@ -281,12 +368,10 @@ def _draw_meme_text(
         y = image_size - padding - total_height
 
     # Draw each line centered, accounting for outline width to prevent clipping
-    for i, line in enumerate(lines):
-        bbox = draw.textbbox((0, 0), line, font=font)
-        text_width = bbox[2] - bbox[0]
+    for line, line_width in zip(lines, line_widths):
         # Ensure outline doesn't get clipped on left or right edges
         available_width = image_size - 2 * outline_width
-        x = outline_width + max(0, (available_width - text_width) // 2)
+        x = outline_width + max(0, (available_width - line_width) // 2)
 
         draw_text_with_outline(
             draw,
@@ -574,7 +659,7 @@ class MemeGenerator:
             "error": error,
         })
 
-    def extract_frames(
+    async def extract_frames(
         self,
         video_path: str,
         timestamps: List[float],
@@ -582,11 +667,14 @@ class MemeGenerator:
         """
         Extract frames from video at specified timestamps using FFmpeg.
 
-        Returns list of {timestamp, path} dicts.
+        One FFmpeg process per timestamp, up to FRAME_EXTRACT_CONCURRENCY at
+        a time, without blocking the event loop.
+
+        Returns list of {timestamp, path} dicts, in timestamp order.
         """
-        frames = []
+        semaphore = asyncio.Semaphore(FRAME_EXTRACT_CONCURRENCY)
 
-        for ts in timestamps:
+        async def extract_one(ts: float) -> Optional[Dict[str, Any]]:
             output_path = os.path.join(self.job_dir, f"frame_{ts:.2f}.jpg")
 
             try:
@@ -598,19 +686,32 @@ class MemeGenerator:
                     '-q:v', '2',  # High quality JPEG
                     output_path
                 ]
-                result = subprocess.run(cmd, capture_output=True, timeout=30)
-
-                if result.returncode == 0 and os.path.exists(output_path):
-                    frames.append({
+                async with semaphore:
+                    process = await asyncio.create_subprocess_exec(
+                        *cmd,
+                        stdin=asyncio.subprocess.DEVNULL,
+                        stdout=asyncio.subprocess.DEVNULL,
+                        stderr=asyncio.subprocess.PIPE,
+                    )
+                    try:
+                        _, stderr = await asyncio.wait_for(process.communicate(), 30)
+                    except asyncio.TimeoutError:
+                        process.kill()
+                        await process.wait()
+                        raise subprocess.TimeoutExpired(cmd, 30)
+
+                if process.returncode == 0 and os.path.exists(output_path):
+                    return {
                         "timestamp": ts,
                         "path": output_path,
-                    })
-                else:
-                    print(f"Failed to extract frame at {ts}s: {result.stderr.decode()}")
+                    }
+                print(f"Failed to extract frame at {ts}s: {stderr.decode(errors='replace')}")
             except Exception as e:
                 print(f"Frame extraction error at {ts}s: {e}")
+            return None
 
-        return frames
+        results = await asyncio.gather(*[extract_one(ts) for ts in timestamps])
+        return [frame for frame in results if frame is not None]
 
     def get_smart_timestamps(
         self,
@@ -1028,7 +1129,7 @@ Return ONLY valid JSON, no markdown code blocks.""",
             print(f"Extracting {len(timestamps)} frames at timestamps: {timestamps}")
 
             # Extract frames
-            extracted_frames = self.extract_frames(video_path, timestamps)
+            extracted_frames = await self.extract_frames(video_path, timestamps)
             print(f"Successfully extracted {len(extracted_frames)} frames")
 
             if not extracted_frames: